@@ -20,6 +20,9 @@
 #   watchdog
 #   streamlit-js-eval
 #   streamlit-option-menu
+#   tomli-w (and tomli on Python < 3.11)
+#   orjson (optional, faster reading and writing of chat files)
+#   pybase64 (optional, faster encoding of inlined background images)
 #
 # VSCode Notes: Run with 'streamlit run app.py' from the terminal or press
 #               Cmd+Shift+D to bring up the debugging interface.
@@ -31,6 +34,12 @@
 #   [client]
 #   showSidebarNavigation = false
 #
+#   Static file serving is used for the background images in src/static,
+#   it is only read at startup so restart the app after adding it:
+#
+#   [server]
+#   enableStaticServing = true
+#
 # Useful Links:
 #   https://icons.getbootstrap.com/
 #
@@ -40,10 +49,15 @@
 
 import streamlit as st
 import os
+import logging
 from utilities.application_utilities import validate_session_state, dynamic_streamlit_menu
 from utilities.application_utilities import load_config, apply_config
 from utilities.styling_utilities import *
 
+# Configure logging once for the whole app, basicConfig does nothing when
+# the root logger already has handlers on later reruns
+logging.basicConfig(level=logging.INFO)
+
 # Get the absolute path to the project root
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 STATIC_DIR = os.path.join(BASE_DIR, 'images')
@@ -73,15 +87,10 @@ def event_handler():
     st.logo(os.path.join(STATIC_DIR, 'logo_image.png'), 
             link="http://localhost:8501", 
             icon_image=os.path.join(STATIC_DIR, 'logo_icon.png'))
-    tweak_logo_position_and_padding()
-
-    # Always hide the sidebar header if in horizontal orientation
-    if st.session_state.get("orientation", "vertical") == 'horizontal':
-        hide_sidebar_header()
 
-    # Hide the streamlit std burger menu, reduce the vertical padding accordingly
-    hide_streamlit_header_menu_and_footer()
-    reduce_vertical_main_padding()
+    # Tweak the logo padding, hide the streamlit std burger menu and reduce the
+    # vertical padding, hiding the sidebar header too if in horizontal orientation
+    apply_app_styles(st.session_state.get("orientation", "vertical"))
 
     selected_page, page_dict = dynamic_streamlit_menu(
         st.session_state.get("orientation", "vertical")
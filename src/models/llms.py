@@ -18,29 +18,145 @@
 
 import streamlit as st
 import json
-import re
 import logging
+import time
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Any
-from abc import ABC, abstractmethod
 from utilities.application_utilities import read_api_settings
-from langchain_openai import ChatOpenAI
-from openai import OpenAI
-from langchain_anthropic import ChatAnthropic
-import anthropic
-from langchain_google_genai import ChatGoogleGenerativeAI
-import google.generativeai as genai
-from langchain_core.messages import AIMessage
-from langchain_google_genai import (
-    ChatGoogleGenerativeAI,
-    HarmBlockThreshold,
-    HarmCategory,
-)
+
+# The provider SDKs (openai, anthropic, google-generativeai and their 
+# langchain integrations) are heavy to import, so they are imported lazily
+# where they are used. Only the SDK of the configured provider gets loaded.
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.ERROR)
-    
-class BaseLLMModel(ABC):
-    """Abstract base class for LLM models."""
+
+# Minimum time (seconds) and text size between updates of a streamed response
+STREAM_MIN_INTERVAL = 0.05
+STREAM_MIN_CHARS = 8
+
+def coalesce_text_chunks(chunks, min_interval=STREAM_MIN_INTERVAL, min_chars=STREAM_MIN_CHARS):
+    """
+    Combine streamed text chunks into larger ones. st.write_stream re-renders
+    the whole response as markdown for every chunk, so passing on one chunk
+    per token makes streaming quadratic in the response length. Text is 
+    passed on at most every min_interval seconds, and only once at least 
+    min_chars characters have been collected, the rest at the end.
+    """
+    buffer = []
+    buffered_chars = 0
+    last_flush = time.monotonic()
+    for chunk in chunks:
+        if not chunk:
+            continue
+        buffer.append(chunk)
+        buffered_chars += len(chunk)
+        now = time.monotonic()
+        if buffered_chars >= min_chars and now - last_flush >= min_interval:
+            yield "".join(buffer)
+            buffer.clear()
+            buffered_chars = 0
+            last_flush = now
+    if buffer:
+        yield "".join(buffer)
+
+def _openai_text_chunks(stream):
+    """Yield the text content of OpenAI chat completion stream chunks."""
+    for chunk in stream:
+        if chunk.choices and chunk.choices[0].delta.content:
+            yield chunk.choices[0].delta.content
+
+@lru_cache(maxsize=32)
+def format_model_name(model_string: str) -> str:
+    """
+    Extracts the model name part of a model string, excluding any date 
+    version part if present, and capitalizes the first letter of each word
+    between '-' signs. Results are memoized per model string.
+
+    Args:
+    model_string (str): The input model string 
+    (e.g., "claude-3-5-sonnet-20240620", "gpt-4o", or "gpt-4-mini")
+
+    Returns:
+    str: The model name without the date version part, with each word capitalized
+    """
+    parts = model_string.split('-')
+
+    # Drop a trailing date version, either YYYYMMDD or YYYY-MM-DD
+    if len(parts) > 1 and len(parts[-1]) == 8 and parts[-1].isdigit():
+        del parts[-1:]
+    elif (len(parts) > 3 and 
+          [len(part) for part in parts[-3:]] == [4, 2, 2] and 
+          all(part.isdigit() for part in parts[-3:])):
+        del parts[-3:]
+
+    # Capitalize each word between '-' signs
+    return '-'.join(part.capitalize() for part in parts)
+
+# The SDK clients below hold HTTP connection pools and are expensive to 
+# create, so they are shared across reruns and sessions. They only depend on
+# model, temperature and API key - the per-request system message is kept in
+# the wrapper classes.
+@st.cache_resource(show_spinner=False)
+def get_anthropic_clients(model: str, temperature: float, api_key: str):
+    """Return cached (ChatAnthropic, anthropic.Anthropic) clients."""
+    import anthropic
+    from langchain_anthropic import ChatAnthropic
+
+    agentic_model = ChatAnthropic(
+        model=model,
+        temperature=temperature,
+        anthropic_api_key=api_key
+    )
+    return agentic_model, anthropic.Anthropic(api_key=api_key)
+
+@st.cache_resource(show_spinner=False)
+def get_gemini_agentic_client(model: str, temperature: float, api_key: str):
+    """Return a cached ChatGoogleGenerativeAI client."""
+    from langchain_google_genai import (
+        ChatGoogleGenerativeAI,
+        HarmBlockThreshold,
+        HarmCategory,
+    )
+
+    return ChatGoogleGenerativeAI(
+        model=model,
+        safety_settings={
+            HarmCategory.HARM_CATEGORY_DANGEROUS_CONTENT: HarmBlockThreshold.BLOCK_NONE,
+        },
+        temperature=temperature,
+        google_api_key=api_key,
+    )
+
+@st.cache_resource(show_spinner=False)
+def get_openai_clients(model: str, temperature: float, api_key: str):
+    """Return cached (ChatOpenAI, OpenAI) clients."""
+    from langchain_openai import ChatOpenAI
+    from openai import OpenAI
+
+    agentic_model = ChatOpenAI(
+        model=model,
+        temperature=temperature,
+        api_key=api_key
+    )
+    return agentic_model, OpenAI(api_key=api_key)
+
+@st.cache_resource(show_spinner=False, max_entries=1)
+def configure_gemini(api_key: str):
+    """
+    Configure the google.generativeai module with the API key, only again
+    when the key changes. Returns the configured module.
+    """
+    import google.generativeai as genai
+
+    genai.configure(api_key=api_key)
+    return genai
+
+class BaseLLMModel:
+    """Base class for LLM models."""
+
+    __slots__ = ("system_message", "temperature", "model", "json_response", "headers")
 
     def __init__(self, system_message: str, temperature: float, 
                  model: str = None, json_response: bool = False, tools = []):
@@ -59,10 +175,9 @@ class BaseLLMModel(ABC):
         self.json_response = json_response
         self.headers = {'Content-Type': 'application/json'}
 
-    @abstractmethod
     def invoke(self, messages: List[Dict[str, str]]) -> str:
         """Invoke the model with the given messages."""
-        pass
+        raise NotImplementedError
 
     def stream_response(self, messages):
         """
@@ -72,27 +187,25 @@ class BaseLLMModel(ABC):
 
         if model_class == "OpenAIModel":
             stream = self.stream(messages)
-            return st.write_stream(stream)
+            return st.write_stream(coalesce_text_chunks(_openai_text_chunks(stream)))
         elif model_class == "ClaudeModel":
             stream = self.stream(messages)
             with stream as stream:
-                return st.write_stream(stream.text_stream)
+                return st.write_stream(coalesce_text_chunks(stream.text_stream))
         elif model_class == "GeminiModel":
-            stream = self.stream(messages)
-            message_placeholder = st.empty()
-            full_response = ""
-            for chunk in stream:
-                full_response += chunk
-                message_placeholder.markdown(full_response + "▌")
-            message_placeholder.markdown(full_response)
-            return full_response
+            # stream() already yields plain text chunks
+            return st.write_stream(coalesce_text_chunks(self.stream(messages)))
         else:
             return f"Error: Streaming not implemented for {model_class}"
 
     def _process_response(self, response_content: str) -> str:
-        """Process the response content based on the json_response flag."""
+        """
+        Process the response content based on the json_response flag. JSON
+        responses are validated (raising ValueError if invalid) and returned
+        as is, rather than being re-serialized.
+        """
         if self.json_response:
-            return json.dumps(json.loads(response_content))
+            json.loads(response_content)
         return response_content
 
     def _handle_error(self, e: Exception) -> str:
@@ -106,51 +219,23 @@ class BaseLLMModel(ABC):
         Returns the model name excluding any date version part, suitable for use
         in e.g. the greeting prompt of chat-bots or assistants. 
         """
-        return self.large_model_name(self.model)
+        return format_model_name(self.model)
 
     @staticmethod
     def large_model_name() -> str:
         """
-        Reads the full current large model from the application settings file.
-        Extracts the model name part, excluds any date version part if present,
-        and capitalizes the first letter of each word between '-' signs.
-
-        This method can be used both as an instance method and as a static 
-        method.
-
-        Args:
-        model_string (str): The input model string 
-        (e.g., "claude-3-5-sonnet-20240620", "gpt-4o", or "gpt-4-mini")
+        Reads the full current large model from the application settings file
+        and returns its formatted name (see format_model_name).
 
         Returns:
         str: The model name without the date version part, with each word capitalized
         """
         api_settings = read_api_settings()
-        model_string = api_settings.get("large_model")
-
-        # Pattern to match date formats: YYYY-MM-DD or YYYYMMDD at the end of the string
-        date_pattern = r'-?(\d{4}(-?\d{2}){2})$'
-
-        # Try to find a match
-        match = re.search(date_pattern, model_string)
-
-        if match:
-            # If a date is found, remove it
-            model_name = model_string[:match.start()]
-            # Remove any trailing dash if present
-            model_name = model_name.rstrip('-')
-        else:
-            # If no date is found, use the original string
-            model_name = model_string
-
-        # Capitalize each word between '-' signs
-        words = model_name.split('-')
-        capitalized_words = [word.capitalize() for word in words]
-        capitalized_model_name = '-'.join(capitalized_words)
-
-        return capitalized_model_name
+        return format_model_name(api_settings.get("large_model"))
 
 class ClaudeModel(BaseLLMModel):
+    __slots__ = ("api_key", "agentic_model", "native_model", "tools")
+
     def __init__(self, system_message: str, temperature: float, 
                  model: str = None, json_response: bool = False, 
                  tools: List[Any] = None):
@@ -159,20 +244,15 @@ class ClaudeModel(BaseLLMModel):
         self.api_key = api_settings.get("anthropic_api_key")
         self.model = self.model or api_settings.get("large_model")
 
-        # Create the ChatAnthropic instance with tools for langgraph
-        self.agentic_model = ChatAnthropic(
-            model=self.model,
-            temperature=self.temperature,
-            anthropic_api_key=self.api_key
-        )
+        # Get the ChatAnthropic instance for langgraph and the native client
+        self.agentic_model, self.native_model = get_anthropic_clients(
+            self.model, self.temperature, self.api_key)
+
         # Bind tools if any
         self.tools = tools
         if self.tools is not None:
             self.agentic_model.bind_tools(self.tools)
 
-        # Create the native Anthropic client
-        self.native_model = anthropic.Anthropic(api_key=self.api_key)
-
     def invoke(self, messages):
         """Invoke the Claude model with the given messages."""
         try:
@@ -194,7 +274,19 @@ class ClaudeModel(BaseLLMModel):
         )
         return completion
 
+
 class GeminiModel(BaseLLMModel):
+    __slots__ = ("api_key", "agentic_model", "native_model", "tools")
+
+    # Maps message roles to the roles understood by the Gemini API
+    _ROLE_MAP = {
+        "system": "user",
+        "human": "user",
+        "user": "user",
+        "ai": "model",
+        "assistant": "model"
+    }
+
     def __init__(self, system_message: str, temperature: float, 
                  model: str = None, json_response: bool = False, 
                  tools: List[Any] = None):
@@ -204,7 +296,7 @@ class GeminiModel(BaseLLMModel):
         self.model = self.model or api_settings.get("large_model")
 
         # Configure the API
-        genai.configure(api_key=self.api_key)
+        genai = configure_gemini(self.api_key)
 
         # Initialize the native Google API model with system instruction
         self.native_model = genai.GenerativeModel(
@@ -218,41 +310,43 @@ class GeminiModel(BaseLLMModel):
             system_instruction=system_message
         )
 
-        # Initialize the Langchain model with safety settings
-        self.agentic_model = ChatGoogleGenerativeAI(
-            model=self.model,
-            safety_settings={
-                HarmCategory.HARM_CATEGORY_DANGEROUS_CONTENT: HarmBlockThreshold.BLOCK_NONE,
-            },
-            temperature=self.temperature,
-            google_api_key=self.api_key,
-        )
+        # Get the Langchain model with safety settings
+        self.agentic_model = get_gemini_agentic_client(
+            self.model, self.temperature, self.api_key)
 
         # Bind tools if any
         self.tools = tools
         if self.tools is not None:
             self.agentic_model = self.agentic_model.bind_tools(self.tools)
 
+    def _format_messages(self, messages: List[Dict[str, str]]) -> List[Dict[str, Any]]:
+        """Convert dict or LangChain messages into Gemini content entries."""
+        role_map = self._ROLE_MAP
+        formatted_messages = []
+        for message in messages:
+            if isinstance(message, dict):
+                role = message.get("role", "user")
+                content = message.get("content", "")
+            else:
+                # Assuming message is a LangChain message object
+                role = message.type
+                content = message.content
+
+            gemini_role = role_map.get(role)
+            if gemini_role is None:
+                continue
+            if role == "system":
+                # Pass the system message on as a prefixed user message
+                content = f"System: {content}"
+            formatted_messages.append({"role": gemini_role, "parts": [{"text": content}]})
+        return formatted_messages
+
     def invoke(self, messages: List[Dict[str, str]]):
+        from langchain_core.messages import AIMessage
+
         try:
             # Prepare the content from messages
-            formatted_messages = []
-            for message in messages:
-                if isinstance(message, dict):
-                    role = message.get("role", "user")
-                    content = message.get("content", "")
-                else:
-                    # Assuming message is a LangChain message object
-                    role = message.type
-                    content = message.content
-
-                if role == "system":
-                    # Prepend system message to the first user message
-                    formatted_messages.append({"role": "user", "parts": [{"text": f"System: {content}"}]})
-                elif role == "human" or role == "user":
-                    formatted_messages.append({"role": "user", "parts": [{"text": content}]})
-                elif role == "ai" or role == "assistant":
-                    formatted_messages.append({"role": "model", "parts": [{"text": content}]})
+            formatted_messages = self._format_messages(messages)
 
             # Generate content using the native model
             response = self.native_model.generate_content(formatted_messages)
@@ -264,24 +358,10 @@ class GeminiModel(BaseLLMModel):
 
     def stream(self, messages: List[Dict[str, str]]):
         """Stream responses from the Gemini model."""
-        try:
-            # Use the same message formatting as in the invoke method
-            formatted_messages = []
-            for message in messages:
-                if isinstance(message, dict):
-                    role = message.get("role", "user")
-                    content = message.get("content", "")
-                else:
-                    role = message.type
-                    content = message.content
-
-                if role == "system":
-                    formatted_messages.append({"role": "user", "parts": [{"text": f"System: {content}"}]})
-                elif role == "human" or role == "user":
-                    formatted_messages.append({"role": "user", "parts": [{"text": content}]})
-                elif role == "ai" or role == "assistant":
-                    formatted_messages.append({"role": "model", "parts": [{"text": content}]})
+        # Use the same message formatting as in the invoke method
+        formatted_messages = self._format_messages(messages)
 
+        try:
             # Generate content using the native model with streaming
             response = self.native_model.generate_content(formatted_messages, stream=True)
 
@@ -292,7 +372,10 @@ class GeminiModel(BaseLLMModel):
         except Exception as e:
             yield self._handle_error(e)
 
+
 class OpenAIModel(BaseLLMModel):
+    __slots__ = ("api_key", "agentic_model", "native_model", "_system_msg_dict")
+
     def __init__(self, system_message: str, temperature: float, 
                  model: str = None, json_response: bool = False, 
                  tools: List[Any] = None):
@@ -301,25 +384,19 @@ class OpenAIModel(BaseLLMModel):
         self.api_key = api_settings.get("openai_api_key")
         self.model = self.model or api_settings.get("large_model")
 
-        # Create the ChatOpenAI instance with tools for langgraph
-        self.agentic_model = ChatOpenAI(
-            model=self.model,
-            temperature=self.temperature,
-            api_key=self.api_key
-        )
+        # Get the ChatOpenAI instance for langgraph and the native client
+        self.agentic_model, self.native_model = get_openai_clients(
+            self.model, self.temperature, self.api_key)
         if tools:
             self.agentic_model = self.agentic_model.bind_tools(tools)
 
-        # Create the native OpenAI client
-        self.native_model = OpenAI(api_key=self.api_key)
+        # The system message is fixed per instance, build its entry once
+        self._system_msg_dict = {"role": "system", "content": self.system_message}
 
     def invoke(self, messages: List[Dict[str, str]]) -> str:
         try:
             # Prepare messages including the system message
-            formatted_messages = [
-                {"role": "system", "content": self.system_message},
-                *messages
-            ]
+            formatted_messages = [self._system_msg_dict, *messages]
 
              # Invoke the ChatOpenAI instance
             response = self.agentic_model.invoke(formatted_messages)
@@ -330,15 +407,13 @@ class OpenAIModel(BaseLLMModel):
     def stream(self, messages: List[Dict[str, str]]):
         stream = self.native_model.chat.completions.create(
             model=self.model,
-            messages=[
-                {"role": "system", "content": self.system_message},
-                *messages
-            ],
+            messages=[self._system_msg_dict, *messages],
             stream=True,
             temperature=self.temperature,
         )
         return stream
 
+
 def get_llm_model(model_client: str, temperature: float, model: str = None, 
                   json_response: bool = False, system_message: str = None, 
                   tools: List[Any] = None, **kwargs) -> BaseLLMModel:
@@ -371,4 +446,20 @@ def get_small_llm_model(system_message: str = None, temperature: float = 0,
     small_model = api_settings.get("small_model")
     return get_llm_model(model_client=model_client, temperature=temperature, 
                          model=small_model, system_message=system_message, 
-                         tools=tools)  
\ No newline at end of file
+                         tools=tools)
+
+def gather_invoke(models: List[BaseLLMModel], 
+                  messages: List[Dict[str, str]]) -> List[Any]:
+    """
+    Invoke several models with the same messages concurrently, e.g. a large
+    and a small model or models from different providers. The calls are 
+    HTTP bound, so the total latency is that of the slowest model instead of
+    the sum of all of them.
+
+    Returns:
+        list: The responses, in the same order as the models.
+    """
+    if not models:
+        return []
+    with ThreadPoolExecutor(max_workers=len(models)) as executor:
+        return list(executor.map(lambda model: model.invoke(messages), models))
@@ -3,27 +3,19 @@ from pages.base_page import BasePage
 import streamlit as st
 
 class AntDesignIconDemoPage(BasePage):
+    __slots__ = ()
+    LABEL = "Ant Design Icons"
+    ICON = "AppstoreOutlined"
+    ORDER = 102
+    PARENT = "icon_types_group"
+    ICON_TYPE = "ad-"  # Use Ant Design icons
+
     def show_page(self):
         st.title("Ant Design Icons")
         st.write("This page demonstrates Ant Design icons with the 'ad-' prefix.")
         st.markdown("""
-        Ant Design icons need the 'ad-' prefix in the `icon_type()` method.
+        Ant Design icons need the 'ad-' prefix in the `ICON_TYPE` attribute.
 
-        Example: `return "ad-"`
+        Example: `ICON_TYPE = "ad-"`
         """)
         st.markdown("See: [Ant Design Icons](https://ant.design/components/icon)")
-
-    def label(self):
-        return "Ant Design Icons"
-
-    def icon(self):
-        return "AppstoreOutlined"
-
-    def order(self):
-        return 102
-
-    def parent(self):
-        return "icon_types_group"
-
-    def icon_type(self):
-        return "ad-"  # Use Ant Design icons
\ No newline at end of file
@@ -21,61 +21,56 @@
 import os
 import streamlit as st
 from pages.base_page import BasePage
-from utilities.application_utilities import validate_session_state
-import toml
+from utilities.application_utilities import validate_session_state, load_toml, write_toml
 
 # Get the absolute path to the project root
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 APP_CONFIG_PATH = os.path.join(BASE_DIR, '.config', 'app_config.toml')
 
-class ApiSettingsPage(BasePage):
+# Settings shown on the page as (session state key, app_config section, default)
+SETTINGS_DEFAULTS = (
+    ("db_file_path", "database", ""),
+    ("eod_api_key", "database", ""),
+    ("openai_api_key", "LLM", ""),
+    ("langchain_api_key", "LLM", ""),
+    ("anthropic_api_key", "LLM", ""),
+    ("google_api_key", "LLM", ""),
+    ("perplexity_api_key", "search", ""),
+    ("brave_api_key", "search", ""),
+    ("large_model", "LLM", "gpt-4o"),
+    ("small_model", "LLM", "gpt-4o-mini"),
+    ("exa_ai_api_key", "RAG", ""),
+)
+
+# Selectable models and their option index in the selectboxes
+LARGE_MODELS = ("o3-mini", "o1-mini", "gpt-4o", "gpt-4o-mini-2024-07-18", 
+                "claude-3-7-sonnet-20250219", "claude-3-5-sonnet-20241022", 
+                "claude-3-haiku-20240307", "gemini-1.5-pro-latest")
+SMALL_MODELS = ("o3-mini", "gpt-4o-mini-2024-07-18", "claude-3-haiku-20240620", 
+                "gemini-1.5-flash-latest")
+LARGE_MODEL_INDEX = {model: i for i, model in enumerate(LARGE_MODELS)}
+SMALL_MODEL_INDEX = {model: i for i, model in enumerate(SMALL_MODELS)}
 
-    def responsive_padding(self):
-        padding_css = """
-        <style>
-        .responsive-padding {
-            padding: 1vh 1vw;
-        }
-        </style>
-        """
-        st.html(padding_css)
+class ApiSettingsPage(BasePage):
+    __slots__ = ()
+    LABEL = "API Settings"
+    ICON = "gear"
+    ORDER = 95
 
     def show_page(self):
         validate_session_state()
         st.title("API Keys")
 
-        # Add responsive padding
-        self.responsive_padding()
-
         # Load current app configuration
         if not os.path.exists(APP_CONFIG_PATH):
             self.create_default_app_config()
 
-        app_config = toml.load(APP_CONFIG_PATH)
+        app_config = load_toml(APP_CONFIG_PATH)
 
         # Load the settings from session state or default to values in the config file
-        if "db_file_path" not in st.session_state:
-            st.session_state["db_file_path"] = app_config.get('database', {}).get('db_file_path', '')
-        if "eod_api_key" not in st.session_state:
-            st.session_state["eod_api_key"] = app_config.get('database', {}).get('eod_api_key', '')
-        if "openai_api_key" not in st.session_state:
-            st.session_state["openai_api_key"] = app_config.get('LLM', {}).get('openai_api_key', '')
-        if "langchain_api_key" not in st.session_state:
-            st.session_state["langchain_api_key"] = app_config.get('LLM', {}).get('langchain_api_key', '')
-        if "anthropic_api_key" not in st.session_state:
-            st.session_state["anthropic_api_key"] = app_config.get('LLM', {}).get('anthropic_api_key', '')
-        if "google_api_key" not in st.session_state:
-            st.session_state["google_api_key"] = app_config.get('LLM', {}).get('google_api_key', '')
-        if "perplexity_api_key" not in st.session_state:
-            st.session_state["perplexity_api_key"] = app_config.get('search', {}).get('perplexity_api_key', '')
-        if "brave_api_key" not in st.session_state:
-            st.session_state["brave_api_key"] = app_config.get('search', {}).get('brave_api_key', '')
-        if "large_model" not in st.session_state:
-            st.session_state["large_model"] = app_config.get('LLM', {}).get('large_model', 'gpt-4o')
-        if "small_model" not in st.session_state:
-            st.session_state["small_model"] = app_config.get('LLM', {}).get('small_model', 'gpt-4o-mini')
-        if "exa_ai_api_key" not in st.session_state:
-            st.session_state["exa_ai_api_key"] = app_config.get('RAG', {}).get('exa_ai_api_key', '')
+        for key, section, default in SETTINGS_DEFAULTS:
+            if key not in st.session_state:
+                st.session_state[key] = app_config.get(section, {}).get(key, default)
 
         # Use st.form to group input elements
         with st.form(key="settings_form"):
@@ -93,13 +88,13 @@ class ApiSettingsPage(BasePage):
                 st.subheader("LLM Preferences")
                 large_model = st.selectbox(
                     'Large Model',
-                    options=["o3-mini", "o1-mini", "gpt-4o", "gpt-4o-mini-2024-07-18", "claude-3-7-sonnet-20250219", "claude-3-5-sonnet-20241022", "claude-3-haiku-20240307", "gemini-1.5-pro-latest"],
-                    index=["o3-mini", "o1-mini", "gpt-4o", "gpt-4o-mini-2024-07-18", "claude-3-7-sonnet-20250219", "claude-3-5-sonnet-20241022", "claude-3-haiku-20240307", "gemini-1.5-pro-latest"].index(st.session_state["large_model"])
+                    options=LARGE_MODELS,
+                    index=LARGE_MODEL_INDEX.get(st.session_state["large_model"], 0)
                 )
                 small_model = st.selectbox(
                     'Small Model',
-                    options=["o3-mini", "gpt-4o-mini-2024-07-18", "claude-3-haiku-20240620", "gemini-1.5-flash-latest"],
-                    index=["o3-mini", "gpt-4o-mini-2024-07-18", "claude-3-haiku-20240620", "gemini-1.5-flash-latest"].index(st.session_state["small_model"])
+                    options=SMALL_MODELS,
+                    index=SMALL_MODEL_INDEX.get(st.session_state["small_model"], 0)
                 )
 
             with col2:                
@@ -147,11 +142,12 @@ class ApiSettingsPage(BasePage):
             st.session_state["exa_ai_api_key"] = trimmed_llamacloud_api_key
 
             # Save to app_config
-            app_config['database'] = {
+            new_config = dict(app_config)
+            new_config['database'] = {
                 'db_file_path': trimmed_db_file_path,
                 'eod_api_key': trimmed_eod_api_key
             }
-            app_config['LLM'] = {
+            new_config['LLM'] = {
                 'openai_api_key': trimmed_open_ai_key,
                 'langchain_api_key': trimmed_langchain_api_key,
                 'anthropic_api_key': trimmed_anthropic_api_key,
@@ -159,16 +155,19 @@ class ApiSettingsPage(BasePage):
                 'large_model': large_model,
                 'small_model': small_model
             }
-            app_config['search'] = {
+            new_config['search'] = {
                 'perplexity_api_key': trimmed_perplexity_api_key,
                 'brave_api_key': trimmed_brave_api_key
             }
-            app_config['RAG'] = {
+            new_config['RAG'] = {
                 'exa_ai_api_key': trimmed_llamacloud_api_key
             }
-            with open(APP_CONFIG_PATH, "w") as f:
-                toml.dump(app_config, f)
-            st.rerun()
+
+            # Only rewrite the file and rerun if anything actually changed
+            if new_config != app_config:
+                write_toml(APP_CONFIG_PATH, new_config)
+                st.session_state.pop("chat_validated", None)
+                st.rerun()
 
     def create_default_app_config(self):
         default_app_config = {
@@ -192,14 +191,4 @@ class ApiSettingsPage(BasePage):
                 "exa_ai_api_key": ""
             }
         }
-        with open(APP_CONFIG_PATH, "w") as f:
-            toml.dump(default_app_config, f)
-
-    def label(self):
-        return "API Settings"
-
-    def icon(self):
-        return "gear"
-
-    def order(self):
-        return 95
\ No newline at end of file
+        write_toml(APP_CONFIG_PATH, default_app_config)
@@ -2,64 +2,137 @@
 # -*- coding: utf-8 -*-
 #
 # Module:       base_page.py
-# Description:  Defines the BasePage abstract base class that all pages must
-#               inherit from. This ensures that each page implements the
-#               required methods for displaying content, and providing
-#               label, icon, and order for the menu.
+# Description:  Defines the BasePage base class that all pages must inherit
+#               from. Each page must implement show_page() for displaying 
+#               content, and declare label, icon, and order for the menu as
+#               class attributes.
 #
-# Mandatory Methods:
+# Mandatory Members:
 #   show_page(self): Display the content of the page.
-#   label(self): Return the label for the page to be shown in the menu.
-#   icon(self): Return the icon for the page to be shown in the menu.
-#   order(self): Return the order in which the page should appear in the menu.
+#   LABEL: The label for the page to be shown in the menu.
+#   ICON: The icon for the page to be shown in the menu.
+#   ORDER: The order in which the page should appear in the menu.
+#
+# The menu metadata is declared as class attributes and collected into a
+# dict once per class, available through meta(). The label(), icon() etc.
+# methods return the same values for existing callers and must not be
+# overridden; a page missing LABEL, ICON or ORDER fails when it is defined.
+# Shared base classes that are not pages themselves pass abstract=True.
 #
 # History:
 # 2024-05-18    urot  Created
 # ============================================================================
 
-from abc import ABC, abstractmethod
+import sys
+
+class BasePage:
+    # Pages hold no instance state, subclasses declare empty slots as well
+    __slots__ = ()
+
+    LABEL = None
+    ICON = None
+    ORDER = None
+
+    ### st_ant_menu additions to implement sub-menu & multi-icon support ###
+
+    PARENT = None           # Parent page key or None for top-level pages
+    CHILDREN = ()           # Child page keys, auto-detected when empty
+    GROUP_TYPE = None       # 'group' for group headers or None for standard pages
+    DIVIDER_BEFORE = False  # True to add a divider before this page
+    ICON_TYPE = ""          # Icon type prefix ('ad-', 'fa-', or '' for Bootstrap)
+
+    _META = {}
 
-class BasePage(ABC):
+    # Page classes by defining module and qualified name, filled in when the
+    # classes are created so page discovery doesn't have to scan the modules.
+    # Each module entry also holds the id of the module namespace it was 
+    # filled from, so classes of an earlier import are dropped on re-import
+    _registry = {}
+
+    def __init_subclass__(cls, abstract=False, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # Intermediate bases (class ChatPageBase(BasePage, abstract=True))
+        # are neither checked nor registered as pages
+        if abstract:
+            return
+        # Light replacement for an abstract method check, done once per class
+        if cls.show_page is BasePage.show_page:
+            raise TypeError(f"{cls.__name__} must implement show_page()")
+        # Menu metadata is read from the class attributes, so a page that
+        # leaves them unset or overrides the accessors instead is rejected
+        # here and reported as a failed module by page discovery
+        missing = [name for name in ("LABEL", "ICON", "ORDER")
+                   if getattr(cls, name) is None]
+        if missing:
+            raise TypeError(f"{cls.__name__} must set {', '.join(missing)}")
+        overridden = [name for name in ("label", "icon", "order", "parent",
+                                        "children", "group_type",
+                                        "divider_before", "icon_type")
+                      if getattr(cls, name) is not getattr(BasePage, name)]
+        if overridden:
+            raise TypeError(f"{cls.__name__} must declare menu metadata as "
+                            f"class attributes, not override "
+                            f"{', '.join(n + '()' for n in overridden)}")
+        module = sys.modules.get(cls.__module__)
+        namespace_id = id(module.__dict__) if module is not None else None
+        entry = BasePage._registry.get(cls.__module__)
+        if entry is None or entry[0] != namespace_id:
+            entry = BasePage._registry[cls.__module__] = (namespace_id, {})
+        entry[1][cls.__qualname__] = cls
+        cls._META = {
+            "label": cls.LABEL,
+            "icon": cls.ICON,
+            "order": cls.ORDER,
+            "parent": cls.PARENT,
+            "children": tuple(cls.CHILDREN),
+            "group_type": cls.GROUP_TYPE,
+            "divider_before": cls.DIVIDER_BEFORE,
+            "icon_type": cls.ICON_TYPE
+        }
+
+    @staticmethod
+    def registered_pages(module_name):
+        """Return the page classes defined in the given module."""
+        entry = BasePage._registry.get(module_name)
+        return list(entry[1].values()) if entry else []
+
+    @classmethod
+    def meta(cls):
+        """Return the menu metadata of the page as a dict."""
+        return cls._META
 
-    @abstractmethod
     def show_page(self):
         """Display the content of the page."""
-        pass
+        raise NotImplementedError
 
-    @abstractmethod
     def label(self):
         """Return the label for the page to be shown in the menu."""
-        pass
+        return self.LABEL
 
-    @abstractmethod
     def icon(self):
         """Return the icon for the page to be shown in the menu."""
-        pass
+        return self.ICON
 
-    @abstractmethod
     def order(self):
         """Return the order in which the page should appear in the menu."""
-        pass
-
-    ### st_ant_menu additions to implement sub-menu & multi-icon support ###
+        return self.ORDER
 
     def parent(self):
         """Return parent page key or None for top-level pages."""
-        return None  # Default implementation for top-level pages
+        return self.PARENT
 
     def children(self):
         """Return list of child page keys or empty list."""
-        return []  # Default implementation for pages with no children
+        return list(self.CHILDREN)
 
     def group_type(self):
         """Return 'group' for group headers or None for standard pages."""
-        return None  # Default implementation for standard pages
+        return self.GROUP_TYPE
 
     def divider_before(self):
         """Return True to add a divider before this page."""
-        return False  # Default implementation - no divider
+        return self.DIVIDER_BEFORE
 
     def icon_type(self):
         """Return icon type prefix ('ad-', 'fa-', or '' for Bootstrap)."""
-        return ""  # Default to Bootstrap icons
-
+        return self.ICON_TYPE
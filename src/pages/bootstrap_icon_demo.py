@@ -3,24 +3,18 @@ from pages.base_page import BasePage
 import streamlit as st
 
 class BootstrapIconDemoPage(BasePage):
+    __slots__ = ()
+    LABEL = "Bootstrap Icons"
+    ICON = "heart-fill"
+    ORDER = 101
+    PARENT = "icon_types_group"
+
     def show_page(self):
         st.title("Bootstrap Icons")
         st.write("This page demonstrates Bootstrap icons (default icon type).")
         st.markdown("""
-        Bootstrap icons don't need a prefix in the `icon_type()` method.
+        Bootstrap icons don't need a prefix in the `ICON_TYPE` attribute.
 
-        Example: `return "heart-fill"`
+        Example: `ICON = "heart-fill"`
         """)
         st.markdown("See: [Bootstrap Icons](https://icons.getbootstrap.com/)")
-
-    def label(self):
-        return "Bootstrap Icons"
-
-    def icon(self):
-        return "heart-fill"
-
-    def order(self):
-        return 101
-
-    def parent(self):
-        return "icon_types_group"
\ No newline at end of file
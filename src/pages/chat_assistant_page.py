@@ -14,7 +14,7 @@ from datetime import datetime
 import os
 from pages.base_page import BasePage
 from utilities.application_utilities import validate_session_state
-from utilities.chat_utilities import (save_chat,   
+from utilities.chat_utilities import (save_chat_in_background,   
                 initialize_or_load_chat_session, display_sidebar_chat_history)
 from utilities.styling_utilities import set_background_images
 from models.llms import get_large_llm_model, BaseLLMModel
@@ -24,7 +24,7 @@ import logging
 
 # Custom Page background
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-STATIC_DIR = os.path.join(BASE_DIR, 'images')
+STATIC_DIR = os.path.join(BASE_DIR, 'src', 'static')
 MAIN_CONTAINER_BKG_IMAGE = os.path.join(STATIC_DIR, 'green-paper.png')
 PROMPT_CONTAINER_BKG_IMAGE = os.path.join(STATIC_DIR, 'green-paper-prompt.png')
 ASSISTANT_NAME = "chat"
@@ -60,30 +60,54 @@ IRONIC_COMEDIAN_ASSISTANT_TEMPLATE =\
 # Choose which template to use as the default
 SYSTEM_PROMPT_TEMPLATE = IRONIC_COMEDIAN_ASSISTANT_TEMPLATE
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
+# Split the template around the datetime placeholder once, so each request
+# only has to concatenate the current time in between
+_SYSTEM_PROMPT_PREFIX, _, _SYSTEM_PROMPT_SUFFIX = SYSTEM_PROMPT_TEMPLATE.partition("{}")
+
 logger = logging.getLogger(__name__)
 
 class ChatAssistantPage(BasePage):
-    def __init__(self):
-        if 'chat_current_chat_id' not in st.session_state:
-            st.session_state.chat_current_chat_id = None
+    __slots__ = ()
+    LABEL = "Chat Assistant"
+    ICON = "chat-right-dots"
+    ORDER = 83
 
     def validate_page_session_state(self):
-        validate_session_state()
-
-        if "openai_api_key" not in st.session_state:
-            st.error("OpenAI API key is not set. Please set it in the settings page.")
-            return
-        if "anthropic_api_key" not in st.session_state:
-            st.error("Anthropic API key is not set. Please set it in the settings page.")
-            return
+        # Only validate once per session, the flag is reset when the API 
+        # settings are saved
+        if not st.session_state.get("chat_validated"):
+            validate_session_state()
+
+            if 'chat_current_chat_id' not in st.session_state:
+                st.session_state.chat_current_chat_id = None
+
+            if "openai_api_key" not in st.session_state:
+                st.error("OpenAI API key is not set. Please set it in the settings page.")
+                return
+            if "anthropic_api_key" not in st.session_state:
+                st.error("Anthropic API key is not set. Please set it in the settings page.")
+                return
+            st.session_state.chat_validated = True
+
         st.session_state.chat_current_chat_id, st.session_state.chat_messages = initialize_or_load_chat_session(ASSISTANT_NAME)
 
     def prepare_messages(self):
-        messages = []
-        last_role = None
-        for message in st.session_state.chat_messages:
+        chat_messages = st.session_state.chat_messages
+
+        # The prepared messages are built incrementally, start over when 
+        # another chat has been loaded or the history has been cut short
+        if (st.session_state.get("chat_prepared_source") is not chat_messages or
+            st.session_state.get("chat_prepared_chat_id") != st.session_state.chat_current_chat_id or
+            st.session_state.get("chat_prepared_len", 0) > len(chat_messages)):
+            st.session_state.chat_prepared_source = chat_messages
+            st.session_state.chat_prepared_chat_id = st.session_state.chat_current_chat_id
+            st.session_state.chat_prepared_messages = []
+            st.session_state.chat_prepared_last_role = None
+            st.session_state.chat_prepared_len = 0
+
+        messages = st.session_state.chat_prepared_messages
+        last_role = st.session_state.chat_prepared_last_role
+        for message in chat_messages[st.session_state.chat_prepared_len:]:
             if isinstance(message["content"], dict) and "type" in message["content"]:
                 continue # Skip non-text messages like quotes
 
@@ -94,10 +118,13 @@ class ChatAssistantPage(BasePage):
             messages.append({"role": message["role"], "content": message["content"]})
             last_role = message["role"]
 
+        st.session_state.chat_prepared_last_role = last_role
+        st.session_state.chat_prepared_len = len(chat_messages)
+
         # Ensure the last message is from the user
         if last_role != "user":
-            messages.append({"role": "user", "content": "Please continue."})
-        return messages
+            return messages + [{"role": "user", "content": "Please continue."}]
+        return list(messages)
     
     def show_page(self):
         self.validate_page_session_state()
@@ -152,20 +179,16 @@ class ChatAssistantPage(BasePage):
                     st.session_state.chat_messages.append({"role": "assistant", "content": response})
 
                     # Save chat history after each interaction
-                    try:
-                        save_chat("chat", st.session_state.chat_current_chat_id, st.session_state.chat_messages)
-                    except Exception as e:
-                        st.error(f"An error occurred while saving the chat: {str(e)}")
+                    save_chat_in_background("chat", st.session_state.chat_current_chat_id, 
+                                            st.session_state.chat_messages)
 
     def generate_response(self):
         messages = self.prepare_messages()
         ai_response = ""
 
-        # Get current time
+        # Insert the current time into the template
         current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-
-        # Format the template with the current time
-        system_prompt = SYSTEM_PROMPT_TEMPLATE.format(current_time)
+        system_prompt = _SYSTEM_PROMPT_PREFIX + current_time + _SYSTEM_PROMPT_SUFFIX
         
         try:
             model = get_large_llm_model(system_message=system_prompt, temperature=0)
@@ -175,12 +198,3 @@ class ChatAssistantPage(BasePage):
             st.error(error_message)
             ai_response = error_message
         return ai_response
-
-    def icon(self):
-        return "chat-right-dots"
-
-    def order(self):
-        return 83
-    
-    def label(self):
-        return "Chat Assistant"
\ No newline at end of file
@@ -3,27 +3,19 @@ from pages.base_page import BasePage
 import streamlit as st
 
 class FontAwesomeIconDemoPage(BasePage):
+    __slots__ = ()
+    LABEL = "FontAwesome Icons"
+    ICON = "coffee"
+    ORDER = 103
+    PARENT = "icon_types_group"
+    ICON_TYPE = "fa-"  # Use FontAwesome icons
+
     def show_page(self):
         st.title("FontAwesome Icons")
         st.write("This page demonstrates FontAwesome icons with the 'fa-' prefix.")
         st.markdown("""
-        FontAwesome icons need the 'fa-' prefix in the `icon_type()` method.
+        FontAwesome icons need the 'fa-' prefix in the `ICON_TYPE` attribute.
 
-        Example: `return "fa-"`
+        Example: `ICON_TYPE = "fa-"`
         """)
         st.markdown("See: [FontAwesome Icons](https://fontawesome.com/icons)")
-
-    def label(self):
-        return "FontAwesome Icons"
-
-    def icon(self):
-        return "coffee"
-
-    def order(self):
-        return 103
-
-    def parent(self):
-        return "icon_types_group"
-
-    def icon_type(self):
-        return "fa-"  # Use FontAwesome icons
\ No newline at end of file
@@ -16,17 +16,11 @@ import streamlit as st
 from pages.base_page import BasePage
 
 class HomePage(BasePage):
+    __slots__ = ()
+    LABEL = "Home"
+    ICON = "house"
+    ORDER = 1
 
     def show_page(self):
         st.title("Home Page")
         st.write("Welcome to the Home Page. This is the main dashboard of the application.")
-
-    def label(self):
-        return "Home"
-
-    def icon(self):
-        return "house"
-
-    def order(self):
-        return 1
-
@@ -1,20 +1,24 @@
 # In src/pages/icon_types_group.py
 from pages.base_page import BasePage
+import pandas as pd
 import streamlit as st
+from utilities.styling_utilities import styled_dataframe_html
+
+# Overview of the icon types shown in the pages of this group
+ICON_TYPES = pd.DataFrame({
+    "Icon type": ["Bootstrap", "Ant Design", "FontAwesome"],
+    "ICON_TYPE": ["", "ad-", "fa-"],
+    "Example ICON": ["heart-fill", "AppstoreOutlined", "coffee"],
+})
 
 class IconTypesGroupPage(BasePage):
+    __slots__ = ()
+    LABEL = "Icon Types"
+    ICON = "palette2"
+    ORDER = 100
+    GROUP_TYPE = "group"  # Make this a group header
+
     def show_page(self):
         st.title("Icon Types Group")
         st.write("This is a group header that contains different icon type examples.")
-
-    def label(self):
-        return "Icon Types"
-
-    def icon(self):
-        return "palette2"
-
-    def order(self):
-        return 100
-
-    def group_type(self):
-        return "group"  # Make this a group header
\ No newline at end of file
+        st.html(styled_dataframe_html(ICON_TYPES))
@@ -3,19 +3,13 @@ from pages.base_page import BasePage
 import streamlit as st
 
 class MenuDemoChild2Page(BasePage):
+    __slots__ = ()
+    LABEL = "Child Page 2"
+    ICON = "2-circle"
+    ORDER = 92
+    # This must match the module name of the parent page
+    PARENT = "menu_demo"
+
     def show_page(self):
         st.title("Child Page 2")
         st.write("This is another child page in the hierarchical menu.")
-
-    def label(self):
-        return "Child Page 2"
-
-    def icon(self):
-        return "2-circle"
-
-    def order(self):
-        return 92
-
-    def parent(self):
-        # This must match the module name of the parent page
-        return "menu_demo"
\ No newline at end of file
@@ -3,6 +3,12 @@ from pages.base_page import BasePage
 import streamlit as st
 
 class MenuFeaturesDemoPage(BasePage):
+    __slots__ = ()
+    LABEL = "Menu Features"
+    ICON = "palette"
+    ORDER = 95
+    DIVIDER_BEFORE = True  # Add a divider before this item
+
     def show_page(self):
         st.title("Menu Features Demo")
         st.write("This page demonstrates various features of the Ant Design Menu component.")
@@ -18,15 +24,3 @@ class MenuFeaturesDemoPage(BasePage):
           - FontAwesome icons (prefixed with "fa-")
         - **Nested Submenus**: The "Advanced Features" section has multiple levels
         """)
-
-    def label(self):
-        return "Menu Features"
-
-    def icon(self):
-        return "palette"
-
-    def order(self):
-        return 95
-
-    def divider_before(self):
-        return True  # Add a divider before this item
\ No newline at end of file
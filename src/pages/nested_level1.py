@@ -3,18 +3,12 @@ from pages.base_page import BasePage
 import streamlit as st
 
 class NestedLevel1Page(BasePage):
+    __slots__ = ()
+    LABEL = "Nested Level 1"
+    ICON = "diagram-2"
+    ORDER = 111
+    PARENT = "advanced_features"
+
     def show_page(self):
         st.title("Nested Level 1")
         st.write("This is a nested submenu item at level 1.")
-
-    def label(self):
-        return "Nested Level 1"
-
-    def icon(self):
-        return "diagram-2"
-
-    def order(self):
-        return 111
-
-    def parent(self):
-        return "advanced_features"
\ No newline at end of file
@@ -20,6 +20,10 @@ from pages.base_page import BasePage
 from utilities.application_utilities import save_config, default_light_theme, default_dark_theme
 
 class ThemeSettingsPage(BasePage):
+    __slots__ = ()
+    LABEL = "Theme Settings"
+    ICON = "palette"
+    ORDER = 3
 
     def show_page(self):
         st.title("Theme Settings")
@@ -84,12 +88,3 @@ class ThemeSettingsPage(BasePage):
             st.session_state.theme_status = theme_status
             save_config(theme, orientation, display_mode)
             st.experimental_rerun()
-
-    def label(self):
-        return "Theme Settings"
-
-    def icon(self):
-        return "palette"
-
-    def order(self):
-        return 3
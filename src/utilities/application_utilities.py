@@ -14,68 +14,165 @@
 # ============================================================================
 
 import os
-from time import sleep
+import sys
 import streamlit as st
 from streamlit_option_menu import option_menu
-import toml
+try:
+    import tomllib
+except ImportError:  # Python < 3.11
+    import tomli as tomllib
+import tomli_w
+try:
+    from st_multi_icon_menu import st_multi_icon_menu
+except ImportError:  # Falls back to option_menu
+    st_multi_icon_menu = None
 import importlib
+import tempfile
+from functools import lru_cache
 from pages.base_page import BasePage
 
 # File paths for the configurations
 STREAMLIT_CONFIG_PATH = ".streamlit/config.toml"
 APP_CONFIG_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 
                                '.config', 'app_config.toml')
+PAGES_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "pages")
 
-if "use_st_multi_icon_menu" not in st.session_state:
-    st.session_state.use_st_multi_icon_menu = True
+@st.cache_data(show_spinner=False)
+def _load_toml(path, mtime_ns):
+    with open(path, "rb") as f:
+        return tomllib.load(f)
 
-def load_modules():
-    with st.spinner('Loading modules...'):
-        pages_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "pages")
-        modules = []
-        failed_modules = []
+def load_toml(path):
+    """
+    Load a TOML file. The parsed content is cached and keyed on the file's
+    modification time, so the file is only re-read and re-parsed after it 
+    has been changed on disk.
+    """
+    return _load_toml(path, os.stat(path).st_mtime_ns)
+
+def clear_config_cache():
+    """Drop all cached config data, e.g. after writing to a config file."""
+    _load_toml.clear()
+    _read_api_settings_cached.cache_clear()
+
+def _without_none(data):
+    """Drop None values, which TOML can't represent, from nested dicts."""
+    return {key: _without_none(value) if isinstance(value, dict) else value
+            for key, value in data.items() if value is not None}
 
-        for filename in os.listdir(pages_path):
-            if filename.endswith(".py") and not filename.startswith("__"):
-                module_name = filename[:-3]
-                module_path = f"pages.{module_name}"
+def write_toml(path, data):
+    """
+    Atomically write data as TOML to path. The content is written to a 
+    temporary file in the same directory, which then replaces the target so
+    a failed write never leaves a truncated config file behind. Cached config
+    data is cleared afterwards.
+    """
+    # Serialize up front, so the file is written with a single write call
+    # and a serialization error doesn't leave a temporary file behind
+    content = tomli_w.dumps(_without_none(data)).encode("utf-8")
 
-                try:
-                    module = importlib.import_module(module_path)
+    with tempfile.NamedTemporaryFile("wb", dir=os.path.dirname(path) or ".", 
+                                     suffix=".tmp", delete=False) as f:
+        try:
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+        except OSError:
+            f.close()
+            os.remove(f.name)
+            raise
+    try:
+        os.replace(f.name, path)
+    except OSError:
+        os.remove(f.name)
+        raise
+    clear_config_cache()
+
+def _pages_mtime():
+    """
+    Return the newest modification time in nanoseconds of the pages 
+    directory and the page files in it. The directory changes when a page 
+    is added or removed, a file when it is edited in place. Only the page 
+    files are stat'ed, the directory entries already tell the file type.
+    """
+    newest = os.stat(PAGES_PATH).st_mtime_ns
+    with os.scandir(PAGES_PATH) as entries:
+        for entry in entries:
+            if entry.name.endswith(".py") and entry.is_file():
+                newest = max(newest, entry.stat().st_mtime_ns)
+    return newest
+
+@st.cache_resource(show_spinner=False)
+def _discover_pages(pages_mtime):
+    """
+    Import all page modules and instantiate their page classes. The result 
+    is cached per newest modification time of the page files, see 
+    _pages_mtime(), so the modules are only scanned again when a page file 
+    is added, removed or edited. The page instances are shared between 
+    sessions and must not hold session state.
+
+    Returns:
+        tuple: (modules, failed_modules) where modules is a tuple of 
+               (module_name, page_instance) tuples sorted by order
+    """
+    modules = []
+    failed_modules = []
+
+    # The directory entries come with their file type, no extra stat per file
+    with os.scandir(PAGES_PATH) as entries:
+        filenames = sorted(entry.name for entry in entries 
+                           if entry.is_file() and entry.name.endswith(".py") and 
+                           not entry.name.startswith("__"))
+
+    # Refresh the import finders once per scan, so pages added since the 
+    # last scan are found by the imports below
+    importlib.invalidate_caches()
+
+    for filename in filenames:
+        module_name = filename[:-3]
+        module_path = f"pages.{module_name}"
+
+        try:
+            # Reuse modules that are already imported, Streamlit's file watcher
+            # drops an edited page from sys.modules so it is imported again
+            module = sys.modules.get(module_path) or importlib.import_module(module_path)
 
-                    # Find all classes that inherit from BasePage and are defined in this module
-                    page_classes = []
-                    for name, obj in module.__dict__.items():
-                        if (isinstance(obj, type) and 
-                            issubclass(obj, BasePage) and 
-                            obj is not BasePage and
-                            obj.__module__ == module.__name__):  # Check if class is defined in this module
-                            page_classes.append(obj)
+            # All BasePage subclasses defined in this module, registered by BasePage
+            page_classes = BasePage.registered_pages(module.__name__)
 
-                    # Sort by inheritance depth (most derived classes first)
-                    page_classes.sort(key=lambda cls: len(cls.__mro__), reverse=True)
+            # Use the most derived class (the one with the longest inheritance chain)
+            if page_classes:
+                page_class = max(page_classes, key=lambda cls: len(cls.__mro__))
+                modules.append((module_name, page_class()))
 
-                    # Use the most derived class (the one with the longest inheritance chain)
-                    if page_classes:
-                        modules.append((module_name, page_classes[0]()))
+        except Exception as e:
+            failed_modules.append((module_name, str(e)))
 
-                except Exception as e:
-                    failed_modules.append((module_name, str(e)))
+    # Sort modules by their order once, frozen so the shared result can't 
+    # be modified by callers
+    modules.sort(key=lambda x: x[1].meta()["order"])
 
-        # Sort modules by their order
-        modules.sort(key=lambda x: x[1].order())
+    return tuple(modules), tuple(failed_modules)
+
+def load_modules(pages_mtime=None):
+    # Callers that already have the newest page file mtime pass it in, so 
+    # the pages directory is only scanned once per run
+    if pages_mtime is None:
+        pages_mtime = _pages_mtime()
+    with st.spinner('Loading modules...'):
+        modules, failed_modules = _discover_pages(pages_mtime)
 
         # Set default page
         if modules:
-            st.session_state.default_page = modules[0][1].label()
+            st.session_state.default_page = modules[0][1].meta()["label"]
         else:
             st.session_state.default_page = "Error"  # If no modules exist, set a default error page
 
-        # Report failed modules
+        # Report failed modules in a single element
         if failed_modules:
-            st.warning("Some modules failed to load:")
-            for module, error in failed_modules:
-                st.error(f"Failed to load {module}: {error}")
+            with st.expander(f"{len(failed_modules)} module(s) failed to load", expanded=True):
+                st.markdown("\n".join(f"- **{module}**: `{error}`" 
+                                       for module, error in failed_modules))
 
     return modules
 
@@ -102,14 +199,19 @@ default_dark_theme = {
     }
 }
 
+# Default themes by their base
+default_themes = {
+    "light": default_light_theme["theme"],
+    "dark": default_dark_theme["theme"]
+}
+
 # Determine theme status
 def determine_theme_status(theme):
-    if theme == default_dark_theme["theme"]:
-        return "dark"
-    elif theme == default_light_theme["theme"]:
-        return "light"
-    else:
-        return "custom"
+    # Only the default theme with the same base can match
+    base = theme.get("base") if theme else None
+    if base in default_themes and theme == default_themes[base]:
+        return base
+    return "custom"
 
 # Create default config files if they don't exist
 def create_default_configs():
@@ -117,11 +219,13 @@ def create_default_configs():
         "theme": default_dark_theme["theme"],  # Default to dark theme
         "client": {
             "showSidebarNavigation": False  # Always hide the auto-built sidebar
+        },
+        "server": {
+            "enableStaticServing": True  # Serve src/static, e.g. background images
         }
     }
     os.makedirs(os.path.dirname(STREAMLIT_CONFIG_PATH), exist_ok=True)
-    with open(STREAMLIT_CONFIG_PATH, "w") as f:
-        toml.dump(default_streamlit_config, f)
+    write_toml(STREAMLIT_CONFIG_PATH, default_streamlit_config)
 
     default_app_config = {
         "streamlit-option-menu": {
@@ -138,44 +242,58 @@ def create_default_configs():
     }
     # Create .config directory if it doesn't exist
     os.makedirs(os.path.dirname(APP_CONFIG_PATH), exist_ok=True)
-    with open(APP_CONFIG_PATH, "w") as f:
-        toml.dump(default_app_config, f)
+    write_toml(APP_CONFIG_PATH, default_app_config)
 
 # Apply theme settings immediately
 def apply_theme_settings(theme):
-    st.config.set_option('theme.base', theme.get('base', 'light'))
-    st.config.set_option('theme.primaryColor', theme.get('primaryColor', '#F63366'))
-    st.config.set_option('theme.backgroundColor', theme.get('backgroundColor', '#FFFFFF'))
-    st.config.set_option('theme.secondaryBackgroundColor', theme.get('secondaryBackgroundColor', '#F0F2F6'))
-    st.config.set_option('theme.textColor', theme.get('textColor', '#262730'))
-    # Apply custom font via CSS
-    font_css = f"""
+    # Only touch Streamlit's global config when the theme actually changed
+    theme_sig = (theme.get('base', 'light'),
+                 theme.get('primaryColor', '#F63366'),
+                 theme.get('backgroundColor', '#FFFFFF'),
+                 theme.get('secondaryBackgroundColor', '#F0F2F6'),
+                 theme.get('textColor', '#262730'))
+    if st.session_state.get('_theme_sig') != theme_sig:
+        base, primary, background, secondary_background, text = theme_sig
+        st.config.set_option('theme.base', base)
+        st.config.set_option('theme.primaryColor', primary)
+        st.config.set_option('theme.backgroundColor', background)
+        st.config.set_option('theme.secondaryBackgroundColor', secondary_background)
+        st.config.set_option('theme.textColor', text)
+        st.session_state['_theme_sig'] = theme_sig
+
+    # Apply custom font via CSS, re-emitted on every run as Streamlit drops
+    # elements that aren't rendered again
+    st.markdown(_font_css(theme.get('font', 'sans serif')), unsafe_allow_html=True)
+
+@lru_cache(maxsize=8)
+def _font_css(font):
+    return f"""
     <style>
     body {{
-        font-family: {theme.get('font', 'sans serif')}, sans-serif;
+        font-family: {font}, sans-serif;
     }}
     </style>
     """
-    st.markdown(font_css, unsafe_allow_html=True)
 
 # Load current config values from configuration files if they exist
 def load_config():
-    if not os.path.exists(STREAMLIT_CONFIG_PATH) or not os.path.exists(APP_CONFIG_PATH):
+    # Create the default configs only if reading one of them fails
+    try:
+        config = load_toml(STREAMLIT_CONFIG_PATH)
+        app_config = load_toml(APP_CONFIG_PATH)
+    except FileNotFoundError:
         create_default_configs()
-
-    config = toml.load(STREAMLIT_CONFIG_PATH)
-
-    # Ensure client.showSidebarNavigation is set to False
-    if "client" not in config:
-        config["client"] = {"showSidebarNavigation": False}
-    elif "showSidebarNavigation" not in config["client"]:
-        config["client"]["showSidebarNavigation"] = False
-
-    # Save the config if we had to update it
-    if config["client"]["showSidebarNavigation"] is not False:
-        config["client"]["showSidebarNavigation"] = False
-        with open(STREAMLIT_CONFIG_PATH, "w") as f:
-            toml.dump(config, f)
+        config = load_toml(STREAMLIT_CONFIG_PATH)
+        app_config = load_toml(APP_CONFIG_PATH)
+
+    # Ensure client.showSidebarNavigation is set to False, the config is 
+    # only saved if we had to update it. server.enableStaticServing is left 
+    # as configured, it is only read when the server starts and images fall
+    # back to data URIs without it
+    client = config.setdefault("client", {})
+    if client.get("showSidebarNavigation") is not False:
+        client["showSidebarNavigation"] = False
+        write_toml(STREAMLIT_CONFIG_PATH, config)
 
     theme = config.get("theme", {})
     base = theme.get("base", "light")
@@ -183,7 +301,6 @@ def load_config():
     for key, value in defaults["theme"].items():
         theme.setdefault(key, value)
 
-    app_config = toml.load(APP_CONFIG_PATH)
     extras = app_config.get("streamlit-option-menu", {})
     orientation = extras.get("orientation", "vertical")
     wide_mode = extras.get("wide_mode", False)
@@ -212,71 +329,98 @@ def load_config():
 
 # New function to apply the loaded config
 def apply_config(config_data):
-    for key, value in config_data.items():
-        st.session_state[key] = value
+    # Only write the values that changed, on most reruns nothing does
+    st.session_state.update({key: value for key, value in config_data.items()
+                             if key not in st.session_state or st.session_state[key] != value})
     
     apply_theme_settings(config_data["theme"])
 
 # Helper function for read_app_settings() below
+# Model name prefixes and the AI client serving those models
+AI_CLIENT_PREFIXES = (
+    (("gpt", "o1", "o3"), "openai"),
+    (("claude",), "anthropic"),
+    (("gemini",), "google")
+)
+
 def get_ai_client_and_model(model_name):
-    if model_name.startswith("gpt") or model_name.startswith("o1") or model_name.startswith("o3"):
-        return "openai", model_name
-    elif model_name.startswith("claude"):
-        return "anthropic", model_name
-    elif model_name.startswith("gemini"):
-        return "google", model_name
-    else:
-        raise ValueError(f"Unknown model type: {model_name}")
+    for prefixes, client in AI_CLIENT_PREFIXES:
+        if model_name.startswith(prefixes):
+            return client, model_name
+    raise ValueError(f"Unknown model type: {model_name}")
 
 def read_api_settings():
-    settings = {}
-    if os.path.exists(APP_CONFIG_PATH):
-        app_config = toml.load(APP_CONFIG_PATH)
-
-        # Get the path and clean it
-        raw_path = app_config.get('database', {}).get('db_file_path', '')
-        clean_path = clean_path_string(raw_path) if raw_path else ''
-
-        settings = {
-            "db_file_path": clean_path,
-            "eod_api_key": app_config.get('database', {}).get('eod_api_key', ''),
-            "openai_api_key": app_config.get('LLM', {}).get('openai_api_key', ''),
-            "langchain_api_key": app_config.get('LLM', {}).get('langchain_api_key', ''),
-            "anthropic_api_key": app_config.get('LLM', {}).get('anthropic_api_key', ''),
-            "google_api_key": app_config.get('LLM', {}).get('google_api_key', ''),
-            "perplexity_api_key": app_config.get('search', {}).get('perplexity_api_key', ''),
-            "brave_api_key": app_config.get('search', {}).get('brave_api_key', ''),
-            "large_model": app_config.get('LLM', {}).get('large_model', 'gpt-4o'),
-            "small_model": app_config.get('LLM', {}).get('small_model', 'gpt-4o-mini'),
-            "exa_ai_api_key": app_config.get('RAG', {}).get('exa_ai_api_key', '')
-        }
+    """
+    Return the API and model settings from the app config file, or an empty
+    dict if it doesn't exist. The settings are only re-read when the file's
+    modification time changes.
+    """
+    try:
+        mtime = os.stat(APP_CONFIG_PATH).st_mtime_ns
+    except FileNotFoundError:
+        return {}
+    return dict(_read_api_settings_cached(mtime))
+
+@lru_cache(maxsize=1)
+def _read_api_settings_cached(mtime):
+    app_config = load_toml(APP_CONFIG_PATH)
+    database = app_config.get('database', {})
+    llm = app_config.get('LLM', {})
+    search = app_config.get('search', {})
+
+    # Get the path and clean it
+    raw_path = database.get('db_file_path', '')
+    clean_path = clean_path_string(raw_path) if raw_path else ''
+
+    settings = {
+        "db_file_path": clean_path,
+        "eod_api_key": database.get('eod_api_key', ''),
+        "openai_api_key": llm.get('openai_api_key', ''),
+        "langchain_api_key": llm.get('langchain_api_key', ''),
+        "anthropic_api_key": llm.get('anthropic_api_key', ''),
+        "google_api_key": llm.get('google_api_key', ''),
+        "perplexity_api_key": search.get('perplexity_api_key', ''),
+        "brave_api_key": search.get('brave_api_key', ''),
+        "large_model": llm.get('large_model', 'gpt-4o'),
+        "small_model": llm.get('small_model', 'gpt-4o-mini'),
+        "exa_ai_api_key": app_config.get('RAG', {}).get('exa_ai_api_key', '')
+    }
 
-        # Add AI client and model information for both large and small models
-        large_model = settings["large_model"]
-        settings["ai_client"], settings["ai_model"] = get_ai_client_and_model(large_model)
+    # Add AI client and model information for both large and small models
+    large_model = settings["large_model"]
+    settings["ai_client"], settings["ai_model"] = get_ai_client_and_model(large_model)
 
-        small_model = settings["small_model"]
-        settings["small_ai_client"], settings["small_ai_model"] = get_ai_client_and_model(small_model)
+    small_model = settings["small_model"]
+    settings["small_ai_client"], settings["small_ai_model"] = get_ai_client_and_model(small_model)
 
     return settings
 
+def _init_session_defaults():
+    if "use_st_multi_icon_menu" not in st.session_state:
+        st.session_state.use_st_multi_icon_menu = True
+
 # Ensure necessary session state variables are initialized
 def validate_session_state():
-    # ensure valid state and settings files
+    _init_session_defaults()
+
+    # figure out the page with the lowest order = default_page, only
+    # needed until the page state exists for this session
     if ('default_page' not in st.session_state or
-        'previous_page' not in st.session_state or
-        'orientation' not in st.session_state or
-        'wide_mode' not in st.session_state):
-            # figure out the page with the lowest order() = default_page
-            modules = load_modules()
+        'previous_page' not in st.session_state):
+            load_modules()
             st.session_state.previous_page = st.session_state.default_page
 
-            # read all settings from the config files (or create & use defaults)
+    # read all settings from the config files (or create & use defaults)
+    if ('orientation' not in st.session_state or
+        'wide_mode' not in st.session_state):
             load_config()
 
 # Save configuration to files and update session state
 def clean_path_string(path):
     """Remove excessive escaping from path string."""
+    # Nothing to clean without backslashes, the common case
+    if '\\' not in path:
+        return path
     # Remove double escapes and convert escaped spaces to regular spaces
     return path.replace('\\\\', '').replace('\\ ', ' ')
 
@@ -295,8 +439,16 @@ def save_config(theme=None, orientation=None, wide_mode=True):
         "showSidebarNavigation": False
     }
 
+    # Keep the existing server settings, e.g. enableStaticServing
+    try:
+        server = load_toml(STREAMLIT_CONFIG_PATH).get("server")
+    except FileNotFoundError:
+        server = None
+    if server:
+        streamlit_config["server"] = server
+
     # Load existing app config
-    app_config = toml.load(APP_CONFIG_PATH)
+    app_config = load_toml(APP_CONFIG_PATH)
 
     # Update menu settings
     app_config["streamlit-option-menu"] = {
@@ -308,12 +460,8 @@ def save_config(theme=None, orientation=None, wide_mode=True):
     if 'database' in app_config and 'db_file_path' in app_config['database']:
         app_config['database']['db_file_path'] = clean_path_string(app_config['database']['db_file_path'])
 
-    with open(STREAMLIT_CONFIG_PATH, "w") as f:
-        toml.dump(streamlit_config, f)
-
-    with open(APP_CONFIG_PATH, "w") as f:
-        toml.dump(app_config, f)
-    sleep(0.5)
+    write_toml(STREAMLIT_CONFIG_PATH, streamlit_config)
+    write_toml(APP_CONFIG_PATH, app_config)
     st.rerun()  # Re-run the app to apply the new config files
 
 def build_hierarchical_menu_structure(modules):
@@ -323,7 +471,7 @@ def build_hierarchical_menu_structure(modules):
     need to explicitly list their children.
 
     Args:
-        modules (list): List of (module_name, page_instance) tuples
+        modules (tuple): (module_name, page_instance) tuples sorted by order
 
     Returns:
         list: Hierarchical menu data structure for st_multi_icon_menu
@@ -331,12 +479,13 @@ def build_hierarchical_menu_structure(modules):
     # Create a dictionary to store pages by their module names
     page_dict = {mod[0]: mod[1] for mod in modules}
 
-    # First pass: identify top-level pages and create a mapping of parents to children
+    # First pass: identify top-level pages and create a mapping of parents to children,
+    # both stay sorted by order as the modules are already sorted
     top_level_pages = []
     child_pages = {}
 
     for module_name, page in modules:
-        parent = page.parent()
+        parent = page.meta()["parent"]
         if parent is None:
             # This is a top-level page
             top_level_pages.append((module_name, page))
@@ -346,32 +495,30 @@ def build_hierarchical_menu_structure(modules):
                 child_pages[parent] = []
             child_pages[parent].append((module_name, page))
 
-    # Sort top-level pages by order
-    top_level_pages.sort(key=lambda x: x[1].order())
-
     # Function to recursively build menu items
     def build_menu_item(module_name, page):
+        meta = page.meta()
+
         # Determine icon prefix based on icon_type
-        icon_prefix = page.icon_type()
-        icon_name = f"{icon_prefix}{page.icon()}"
+        icon_name = f"{meta['icon_type']}{meta['icon']}"
 
         # Create the basic menu item
         menu_item = {
             "key": module_name,
-            "label": page.label(),
+            "label": meta["label"],
             "icon": icon_name
         }
 
         # Set group type if specified
-        group_type = page.group_type()
+        group_type = meta["group_type"]
         if group_type:
             menu_item["type"] = group_type
         # Only add divider type if not a group
-        elif page.divider_before():
+        elif meta["divider_before"]:
             menu_item["type"] = "divider"
 
         # Add children - prioritize explicitly defined children, then fall back to auto-detected children
-        explicitly_defined_children = page.children()
+        explicitly_defined_children = meta["children"]
 
         # If this page has explicitly defined children, use those
         if explicitly_defined_children:
@@ -382,11 +529,9 @@ def build_hierarchical_menu_structure(modules):
             ]
         # Otherwise, use children that declared this page as their parent
         elif module_name in child_pages:
-            child_list = child_pages[module_name]
-            child_list.sort(key=lambda x: x[1].order())
             menu_item["children"] = [
                 build_menu_item(child_mod, child_page) 
-                for child_mod, child_page in child_list
+                for child_mod, child_page in child_pages[module_name]
             ]
 
         return menu_item
@@ -400,6 +545,65 @@ def build_hierarchical_menu_structure(modules):
 
     return menu_data
 
+@st.cache_resource(show_spinner=False)
+def _get_label_to_page(pages_mtime):
+    """Return a dictionary mapping page labels to the cached page objects."""
+    modules, _ = _discover_pages(pages_mtime)
+    return {page.meta()["label"]: page for _, page in modules}
+
+@st.cache_data(show_spinner=False)
+def _get_menu_spec(pages_mtime):
+    """
+    Compute the menu metadata of all pages once per newest modification 
+    time of the page files, so the menu can be rendered on every rerun without
+    calling the metadata methods of each page again.
+
+    Returns:
+        dict: Plain menu data with the keys 'menu_data' (hierarchical menu 
+              for st_multi_icon_menu), 'options' and 'icons' (labels and 
+              icons in page order), 'key_to_label' (module name to label)
+              and 'label_to_key' (label to module name)
+    """
+    modules, _ = _discover_pages(pages_mtime)
+    return {
+        "menu_data": build_hierarchical_menu_structure(modules),
+        "options": [page.meta()["label"] for _, page in modules],
+        "icons": [page.meta()["icon"] for _, page in modules],
+        "key_to_label": {module_name: page.meta()["label"] for module_name, page in modules},
+        "label_to_key": {page.meta()["label"]: module_name for module_name, page in reversed(modules)}
+    }
+
+@lru_cache(maxsize=8)
+def _ant_menu_css(primary_color, background_color, secondary_background_color, text_color):
+    """Return the st_multi_icon_menu CSS for the given theme colors."""
+    return f"""
+    .ant-menu {{
+      background-color: {background_color} !important;
+      color: {text_color} !important;
+    }}
+    .ant-menu-item-selected {{
+      background-color: {primary_color} !important;
+      color: {text_color} !important;
+    }}
+    .ant-menu-item:hover {{
+      background-color: {secondary_background_color} !important;
+      color: {text_color} !important;
+    }}
+    .ant-menu-submenu-title:hover {{
+      background-color: {secondary_background_color} !important;
+      color: {text_color} !important;
+    }}
+    .ant-menu-submenu-open > .ant-menu-submenu-title {{
+      color: {primary_color} !important;
+    }}
+    .ant-menu-submenu-selected > .ant-menu-submenu-title {{
+      color: {primary_color} !important;
+    }}
+    .ant-menu-item-divider {{
+      background-color: {primary_color}33 !important;
+    }}
+    """
+
 def dynamic_streamlit_menu(orientation="vertical"):
     """
     Create a dynamic menu based on loaded modules.
@@ -410,132 +614,90 @@ def dynamic_streamlit_menu(orientation="vertical"):
     Returns:
         tuple: (selected_page_label, dictionary mapping labels to page objects)
     """
-    if 'loaded_modules' not in st.session_state:
-        modules = load_modules()
-        st.session_state['loaded_modules'] = modules
-    else:
-        modules = st.session_state['loaded_modules']
-    modules.sort(key=lambda x: x[1].order())
-
-    # Create a dictionary mapping module names to page objects
-    page_dict = {mod[0]: mod[1] for mod in modules}
-
-    # Create a dictionary mapping page labels to page objects
-    label_to_page = {mod[1].label(): mod[1] for mod in modules}
+    # The modules, page lookup and menu data are all cached and only rebuilt
+    # when a page file has been added, removed or edited
+    pages_mtime = _pages_mtime()
+    load_modules(pages_mtime)
+    label_to_page = _get_label_to_page(pages_mtime)
+    menu_spec = _get_menu_spec(pages_mtime)
+    key_to_label = menu_spec["key_to_label"]
 
     # Check if we should use ant_menu or option_menu
     use_st_multi_icon_menu = st.session_state.get("use_st_multi_icon_menu", False)
 
+    if use_st_multi_icon_menu and st_multi_icon_menu is None:
+        # Fall back to option_menu if st_multi_icon_menu is not available
+        st.warning("st_multi_icon_menu is not installed. Falling back to option_menu.")
+        use_st_multi_icon_menu = False
+
     if use_st_multi_icon_menu:
+        # TODO test
 
+        # Hierarchical menu structure
+        menu_data = menu_spec["menu_data"]
 
-        # TODO test
-        try:
-            from st_multi_icon_menu import st_multi_icon_menu
-
-            # Build hierarchical menu structure
-            menu_data = build_hierarchical_menu_structure(modules)
-
-            # Determine theme based on current Streamlit theme
-            theme = "dark" if st.session_state.get("theme", {}).get("base", "light") == "dark" else "light"
-
-            # Get theme colors from session state
-            primary_color = st.session_state.get("theme", {}).get("primaryColor", "#F63366")
-            background_color = st.session_state.get("theme", {}).get("backgroundColor", "#FFFFFF")
-            secondary_background_color = st.session_state.get("theme", {}).get("secondaryBackgroundColor", "#F0F2F6")
-            text_color = st.session_state.get("theme", {}).get("textColor", "#262730")
-
-            # Create custom CSS styling using generall_css_styling
-            generall_css_styling = f"""
-            .ant-menu {{
-              background-color: {background_color} !important;
-              color: {text_color} !important;
-            }}
-            .ant-menu-item-selected {{
-              background-color: {primary_color} !important;
-              color: {text_color} !important;
-            }}
-            .ant-menu-item:hover {{
-              background-color: {secondary_background_color} !important;
-              color: {text_color} !important;
-            }}
-            .ant-menu-submenu-title:hover {{
-              background-color: {secondary_background_color} !important;
-              color: {text_color} !important;
-            }}
-            .ant-menu-submenu-open > .ant-menu-submenu-title {{
-              color: {primary_color} !important;
-            }}
-            .ant-menu-submenu-selected > .ant-menu-submenu-title {{
-              color: {primary_color} !important;
-            }}
-            .ant-menu-item-divider {{
-              background-color: {primary_color}33 !important;
-            }}
-            """
-
-            # Find the default page module name to use as defaultSelectedKeys
-            default_page_label = st.session_state.get("default_page")
-            default_module_name = None
-
-            # Find the module name that corresponds to the default page label
-            for mod_name, page_obj in modules:
-                if page_obj.label() == default_page_label:
-                    default_module_name = mod_name
-                    break
-
-            # If no selected_key in session state, use the default module name
-            selected_key = st.session_state.get("selected_key", default_module_name)
-
-            # Place the menu in the sidebar or horizontally based on orientation
-            if orientation == "vertical":
-                with st.sidebar:
-                    selected_key = st_multi_icon_menu(
-                        menu_data,
-                        key="main_menu",
-                        theme=theme,
-                        inlineIndent=24,
-                        iconMinWidth="24px",
-                        iconSize="16px",
-                        generall_css_styling=generall_css_styling,
-                        defaultSelectedKeys=[selected_key] if selected_key else None
-                    )
-            else:
-                # For horizontal menu
+        # Determine theme based on current Streamlit theme
+        theme = "dark" if st.session_state.get("theme", {}).get("base", "light") == "dark" else "light"
+
+        # Get theme colors from session state
+        primary_color = st.session_state.get("theme", {}).get("primaryColor", "#F63366")
+        background_color = st.session_state.get("theme", {}).get("backgroundColor", "#FFFFFF")
+        secondary_background_color = st.session_state.get("theme", {}).get("secondaryBackgroundColor", "#F0F2F6")
+        text_color = st.session_state.get("theme", {}).get("textColor", "#262730")
+
+        # Create custom CSS styling using generall_css_styling
+        generall_css_styling = _ant_menu_css(primary_color, background_color, 
+                                             secondary_background_color, text_color)
+
+        # Find the default page module name to use as defaultSelectedKeys
+        default_module_name = menu_spec["label_to_key"].get(st.session_state.get("default_page"))
+
+        # If no selected_key in session state, use the default module name
+        selected_key = st.session_state.get("selected_key", default_module_name)
+
+        # Place the menu in the sidebar or horizontally based on orientation
+        if orientation == "vertical":
+            with st.sidebar:
                 selected_key = st_multi_icon_menu(
                     menu_data,
                     key="main_menu",
                     theme=theme,
-                    modus="horizontal",
                     inlineIndent=24,
                     iconMinWidth="24px",
                     iconSize="16px",
                     generall_css_styling=generall_css_styling,
                     defaultSelectedKeys=[selected_key] if selected_key else None
                 )
+        else:
+            # For horizontal menu
+            selected_key = st_multi_icon_menu(
+                menu_data,
+                key="main_menu",
+                theme=theme,
+                modus="horizontal",
+                inlineIndent=24,
+                iconMinWidth="24px",
+                iconSize="16px",
+                generall_css_styling=generall_css_styling,
+                defaultSelectedKeys=[selected_key] if selected_key else None
+            )
 
-            # Store the selected key in session state for next render
-            if selected_key:
-                st.session_state["selected_key"] = selected_key
-
-            # Map the selected key (module name) back to the page label
-            if selected_key:
-                selected_label = page_dict[selected_key].label() if selected_key in page_dict else None
-                return selected_label, label_to_page
-            else:
-                # Default to first page if nothing is selected
-                first_page = modules[0][1]
-                return first_page.label(), label_to_page
+        # Store the selected key in session state for next render
+        if selected_key:
+            st.session_state["selected_key"] = selected_key
 
-        except ImportError:
-            # Fall back to option_menu if st_multi_icon_menu is not available
-            st.warning("st_multi_icon_menu is not installed. Falling back to option_menu.")
-            use_st_multi_icon_menu = False
+        # Map the selected key (module name) back to the page label
+        if selected_key:
+            selected_label = key_to_label.get(selected_key)
+            return selected_label, label_to_page
+        else:
+            # Default to first page if nothing is selected
+            return menu_spec["options"][0], label_to_page
 
     # Use option_menu as fallback
     if not use_st_multi_icon_menu:
-        options = [mod[1].label() for mod in modules]
-        icons = [mod[1].icon() for mod in modules]
+        options = menu_spec["options"]
+        icons = menu_spec["icons"]
 
         # Ensure default_index is valid
         default_index = 0  # Always use 0 as the safe default
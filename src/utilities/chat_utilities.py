@@ -23,10 +23,169 @@ import re
 import subprocess
 import tempfile
 import logging
+import threading
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
+
+# orjson is optional, chat files are read and written with the json module
+# if it isn't installed
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# A single worker writes the chat files in submission order, pending saves of
+# the same chat are coalesced so only the latest messages get written
+_SAVE_POOL = ThreadPoolExecutor(max_workers=1, thread_name_prefix="chat_save")
+_PENDING_SAVES = {}
+_PENDING_SAVES_LOCK = threading.Lock()
+
+# Size in bytes of the largest possible empty chat file, "[]"
+_EMPTY_CHAT_MAX_SIZE = 2
+
+# Chat directories known to exist, so they're only checked once per process
+_ENSURED_CHAT_DIRS = set()
+
+# Chat file names used by older versions, {date}_{time}_{chat_id}.json
+_LEGACY_CHAT_FILE_RE = re.compile(r"^\d{8}_\d{6}_([0-9a-f-]{36})\.json$")
+
+# Patterns used to find and check diagram code in AI responses, compiled once
+_CODE_BLOCK_RE = re.compile(r"```(?:\w*\n)?(.*?)```", re.DOTALL)
+
+# Keywords that trigger a diagram, matched ignoring case
+_DIAGRAM_KEYWORD_RE = re.compile(r"diagram|sketch", re.IGNORECASE)
+_DIAGRAM_TOOL_RES = {
+    "d2": re.compile(r"d2", re.IGNORECASE),
+    "mermaid": re.compile(r"mermaid", re.IGNORECASE),
+}
+
+# Common d2 syntax patterns, combined into one alternation so the code is
+# searched in a single pass
+_D2_DETECT_RE = re.compile("|".join((
+    r'->', # Arrows
+    r'-->', # Different arrow styles
+    r'<->', # Bidirectional arrows
+    r'\.+', # Connections using dots
+    r'shape:', # Shape definitions
+    r'style:', # Style definitions
+    r'direction:', # Direction specifications
+    r'\{.*?\}', # Block definitions
+    r'label:', # Label definitions
+)))
+
+# Common Mermaid syntax patterns, combined the same way
+_MERMAID_DETECT_RE = re.compile("|".join((
+    r'graph\s+[TBLR]?[DRLR]?', # Graph declarations
+    r'sequenceDiagram', # Sequence diagrams
+    r'classDiagram', # Class diagrams
+    r'stateDiagram-v2', # State diagrams
+    r'erDiagram', # Entity Relationship diagrams
+    r'pie\s*title', # Pie charts
+    r'gantt', # Gantt charts
+    r'flowchart\s+[TBLR]?[DRLR]?', # Flowcharts
+    r'-->|--[x]|==>', # Various arrow types
+    r'subgraph', # Subgraph declarations
+    r'participant', # Sequence diagram participants
+    r'class\s+\w+', # Class definitions
+    r'state\s+\w+', # State definitions
+)), re.IGNORECASE)
+
+# Obvious non-Mermaid (Python) code
+_NOT_MERMAID_RE = re.compile(r'import\s+|def\s+|class\s*:')
+
+def _mentions_diagram(text, tool, other_tool):
+    """
+    Check if a text mentions a diagram (or sketch) for the given diagram tool
+    and not for the other one, ignoring case without a lowercased copy of 
+    the text.
+    """
+    return (_DIAGRAM_TOOL_RES[tool].search(text) is not None and 
+            _DIAGRAM_KEYWORD_RE.search(text) is not None and 
+            _DIAGRAM_TOOL_RES[other_tool].search(text) is None)
+
+def _write_chat_file(file_path, messages):
+    """
+    Write chat messages to a JSON file, with orjson if available. The data 
+    is encoded up front and written with a single write to a temporary file,
+    which then replaces the chat file, so a crash can't leave it truncated.
+    """
+    if orjson is not None:
+        data = orjson.dumps(messages)
+    else:
+        data = json.dumps(messages, ensure_ascii=False).encode('utf-8')
+    tmp_path = f"{file_path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, file_path)
+
+def _read_chat_file(file_path):
+    """Read chat messages from a JSON file, with orjson if available."""
+    with open(file_path, 'rb') as f:
+        data = f.read()
+    return orjson.loads(data) if orjson is not None else json.loads(data)
+
+@st.cache_data(ttl=30, show_spinner=False)
+def _scan_chat_dir(folder):
+    """
+    Scan a chat directory in a single pass.
+
+    The result is cached across reruns, so the sidebar doesn't scan the 
+    directory on every interaction, and cleared whenever a chat file is 
+    written or removed. The time to live only bounds how long changes made
+    outside of this module take to show up.
+
+    Args:
+        folder (str): Path to the chat directory
+
+    Returns:
+        list: (filename, mtime, chat_id, size) tuples for all chat files, 
+              most recently modified first
+    """
+    chats = []
+    with os.scandir(folder) as entries:
+        for entry in entries:
+            filename = entry.name
+            if not filename.endswith('.json') or not entry.is_file():
+                continue
+            stat = entry.stat()
+            chats.append((filename, stat.st_mtime, filename[:-5], stat.st_size))
+    chats.sort(key=lambda chat: chat[1], reverse=True)
+    return chats
+
+def _migrate_legacy_chat_files(folder):
+    """
+    Rename chat files named {date}_{time}_{chat_id}.json by older versions to
+    the stable {chat_id}.json. Only names matching that exact pattern are 
+    touched, and the rename keeps the mtime used to order the chats.
+
+    Args:
+        folder (str): Path to the chat directory
+    """
+    with os.scandir(folder) as entries:
+        for entry in entries:
+            match = _LEGACY_CHAT_FILE_RE.match(entry.name)
+            if not match or not entry.is_file():
+                continue
+            stable_path = os.path.join(folder, f"{match.group(1)}.json")
+            try:
+                if not os.path.exists(stable_path):
+                    os.rename(entry.path, stable_path)
+            except OSError as e:
+                logger.error(f"Error renaming legacy chat file {entry.name}: {e}")
+
+@lru_cache(maxsize=256)
+def _read_chat_title(file_path, mtime):
+    """
+    Return the title of a chat file, the start of its first message, or None
+    if the chat is empty. Cached per file and modification time, so only
+    chats that changed since the last run are parsed again.
+    """
+    chat_content = _read_chat_file(file_path)
+    return chat_content[0]['content'][:30] + "..." if chat_content else None
+
 def create_new_chat():
     """
     Create a new chat session for an assistant.
@@ -35,8 +194,7 @@ def create_new_chat():
         tuple: (chat_id, filename)
     """
     chat_id = str(uuid.uuid4())
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    filename = f"{timestamp}_{chat_id}.json"
+    filename = f"{chat_id}.json"
     return chat_id, filename
 
 def get_chat_directory(assistant_name):
@@ -51,13 +209,20 @@ def get_chat_directory(assistant_name):
     """
     chat_dir = f"{assistant_name}_chat_history"
 
-    # Create the directory if it doesn't exist
-    if not os.path.exists(chat_dir):
-        try:
-            os.makedirs(chat_dir)
+    if chat_dir in _ENSURED_CHAT_DIRS:
+        return chat_dir
+
+    # Create the directory if it doesn't exist, otherwise migrate the chat
+    # files of older versions once per process
+    try:
+        if not os.path.isdir(chat_dir):
+            os.makedirs(chat_dir, exist_ok=True)
             logger.info(f"Created chat history directory: {chat_dir}")
-        except Exception as e:
-            logger.error(f"Error creating chat directory {chat_dir}: {str(e)}")
+        else:
+            _migrate_legacy_chat_files(chat_dir)
+        _ENSURED_CHAT_DIRS.add(chat_dir)
+    except Exception as e:
+        logger.error(f"Error creating chat directory {chat_dir}: {str(e)}")
 
     return chat_dir
 
@@ -79,27 +244,44 @@ def save_chat(assistant_name, chat_id, messages):
     folder = get_chat_directory(assistant_name)
 
     try:
-        # Find the existing file for this chat_id
-        existing_files = [f for f in os.listdir(folder) if chat_id in f and f.endswith('.json')]
-
-        # Generate new filename with current timestamp
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        new_filename = f"{timestamp}_{chat_id}.json"
-        new_file_path = os.path.join(folder, new_filename)
-
-        # If an existing file is found, rename it
-        if existing_files:
-            old_file_path = os.path.join(folder, existing_files[0])
-            os.rename(old_file_path, new_file_path)
+        # The file name is stable, the time of the last save is the file's mtime
+        file_path = os.path.join(folder, f"{chat_id}.json")
 
         # Save the updated chat content
-        with open(new_file_path, 'w') as f:
-            json.dump(messages, f)
+        _write_chat_file(file_path, messages)
+        _scan_chat_dir.clear()
         return True
     except Exception as e:
         logger.error(f"Error saving chat: {str(e)}")
         return False
 
+def save_chat_in_background(assistant_name, chat_id, messages):
+    """
+    Save chat messages to a file in a background thread, so the response 
+    doesn't have to wait for the chat to be written. Errors are logged by
+    save_chat.
+
+    Args:
+        assistant_name (str): Name of the assistant
+        chat_id (str): Unique identifier for the chat
+        messages (list): List of message dictionaries
+    """
+    if not messages:  # Don't save empty chat histories
+        return
+
+    key = (assistant_name, chat_id)
+    with _PENDING_SAVES_LOCK:
+        already_pending = key in _PENDING_SAVES
+        _PENDING_SAVES[key] = list(messages)
+    if not already_pending:
+        _SAVE_POOL.submit(_save_pending_chat, key)
+
+def _save_pending_chat(key):
+    with _PENDING_SAVES_LOCK:
+        messages = _PENDING_SAVES.pop(key, None)
+    if messages is not None:
+        save_chat(key[0], key[1], messages)
+
 def load_chat(assistant_name, chat_id):
     """
     Load a specific chat session.
@@ -118,26 +300,20 @@ def load_chat(assistant_name, chat_id):
         if isinstance(chat_id, tuple):
             chat_id = chat_id[0]
 
-        # Find files that contain the chat_id and end with .json
-        matching_files = [f for f in os.listdir(folder) if chat_id in f and f.endswith('.json')]
+        # Chats are stored under their stable file name, no directory scan needed
+        filename = f"{chat_id}.json"
+        file_path = os.path.join(folder, filename)
 
-        if not matching_files:
+        try:
+            content = _read_chat_file(file_path)
+        except FileNotFoundError:
             logger.info(f"No file found for chat_id {chat_id} in folder {folder}")
             return []
 
-        if len(matching_files) > 1:
-            logger.warning(f"Multiple files found for chat_id {chat_id}. Using the most recent one.")
-            matching_files.sort(key=lambda x: os.path.getmtime(os.path.join(folder, x)), reverse=True)
-
-        filename = matching_files[0]
-        file_path = os.path.join(folder, filename)
-
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = json.load(f)
-            if not content:  # Ignore empty files
-                logger.info(f"Ignoring empty chat file: {filename}")
-                return []
-            return content
+        if not content:  # Ignore empty files
+            logger.info(f"Ignoring empty chat file: {filename}")
+            return []
+        return content
 
     except json.JSONDecodeError as e:
         logger.error(f"Error decoding JSON in file for chat_id {chat_id}: {e}")
@@ -163,21 +339,15 @@ def get_recent_chats(assistant_name, limit=5):
         if not os.path.exists(folder):
             return []
 
-        files = [f for f in os.listdir(folder) if f.endswith('.json')]
-        files.sort(key=lambda x: os.path.getmtime(os.path.join(folder, x)), reverse=True)
-
         recent_chats = []
-        for file in files:
+        for file, mtime, chat_id, _ in _scan_chat_dir(folder):
             if len(recent_chats) >= limit:
                 break
-            chat_id = file.split('_')[2].split('.')[0]
             file_path = os.path.join(folder, file)
             try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    chat_content = json.load(f)
-                    if chat_content:  # Only add non-empty chats
-                        chat_title = chat_content[0]['content'][:30] + "..."
-                        recent_chats.append((chat_id, chat_title))
+                chat_title = _read_chat_title(file_path, mtime)
+                if chat_title:  # Only add non-empty chats
+                    recent_chats.append((chat_id, chat_title))
             except Exception as e:
                 logger.error(f"Error reading chat file {file_path}: {e}")
                 continue
@@ -214,10 +384,6 @@ def display_sidebar_chat_history(assistant_name, session_state, rerun_function):
             else:
                 st.sidebar.error(f"Failed to load chat with ID: {chat_id}")
 
-    # Get the total number of chats
-    all_chats = get_all_chats(assistant_name)
-    total_chats = len(all_chats)
-
     st.sidebar.markdown("---")
 
     if st.sidebar.button("New Chat :heavy_plus_sign:", use_container_width=True, type="secondary"):
@@ -247,35 +413,17 @@ def get_all_chats(assistant_name):
         if not os.path.exists(folder):
             return {}
 
-        for filename in os.listdir(folder):
-            if filename.endswith('.json'):
-                try:
-                    parts = filename.split('_')
-                    if len(parts) < 3:
-                        continue
-
-                    chat_id = parts[2].split('.')[0]
-                    timestamp = parts[0]
-
-                    # Try to parse the timestamp and format it
-                    try:
-                        if len(timestamp) == 8:  # YYYYMMDD
-                            dt = datetime.strptime(timestamp, "%Y%m%d")
-                        elif len(timestamp) == 14:  # YYYYMMDDHHMMSS
-                            dt = datetime.strptime(timestamp, "%Y%m%d%H%M%S")
-                        else:
-                            dt = datetime.now()  # Fallback if parsing fails
-                        formatted_time = dt.strftime("%Y-%m-%d %H:%M:%S")
-                    except ValueError:
-                        formatted_time = timestamp  # Use original string if parsing fails
-
-                    with open(os.path.join(folder, filename), 'r') as f:
-                        chat_content = json.load(f)
-                        chat_title = chat_content[0]['content'][:30] + "..." if chat_content else f"Chat {chat_id[:8]}..."
-                    all_chats[chat_id] = {'timestamp': formatted_time, 'title': chat_title}
-                except Exception as e:
-                    logger.error(f"Error processing chat file {filename}: {e}")
-                    continue
+        for filename, mtime, chat_id, _ in _scan_chat_dir(folder):
+            try:
+                # The chat was last saved at the file's modification time
+                formatted_time = datetime.fromtimestamp(mtime).strftime("%Y-%m-%d %H:%M:%S")
+
+                chat_title = (_read_chat_title(os.path.join(folder, filename), mtime) or 
+                              f"Chat {chat_id[:8]}...")
+                all_chats[chat_id] = {'timestamp': formatted_time, 'title': chat_title}
+            except Exception as e:
+                logger.error(f"Error processing chat file {filename}: {e}")
+                continue
     except Exception as e:
         logger.error(f"Error retrieving all chats: {e}")
 
@@ -343,20 +491,135 @@ def cleanup_empty_chats(assistant_name):
         if not os.path.exists(folder):
             return
 
-        for filename in os.listdir(folder):
-            if filename.endswith('.json'):
-                file_path = os.path.join(folder, filename)
-                try:
-                    with open(file_path, 'r') as f:
-                        content = json.load(f)
-                        if not content:
-                            os.remove(file_path)
-                            logger.info(f"Removed empty chat file: {filename}")
-                except Exception as e:
-                    logger.error(f"Error during cleanup of file {filename}: {e}")
+        removed = False
+        for filename, _, _, size in _scan_chat_dir(folder):
+            # An empty chat is at most "[]", larger files can't be empty
+            if size > _EMPTY_CHAT_MAX_SIZE:
+                continue
+            file_path = os.path.join(folder, filename)
+            try:
+                content = _read_chat_file(file_path)
+                if not content:
+                    os.remove(file_path)
+                    removed = True
+                    logger.info(f"Removed empty chat file: {filename}")
+            except Exception as e:
+                logger.error(f"Error during cleanup of file {filename}: {e}")
+        if removed:
+            _scan_chat_dir.clear()
     except Exception as e:
         logger.error(f"Error during cleanup: {e}")
 
+@lru_cache(maxsize=256)
+def _find_diagram_code(latest_query_str, ai_response_str, tool):
+    """
+    Check if a query or AI response asks for a diagram of the given tool and
+    extract the diagram code from the response. Cached per query, response 
+    and tool, as the chat history is checked again on every rerun.
+
+    Args:
+        latest_query_str (str): The user's query
+        ai_response_str (str): The AI's complete response
+        tool (str): The diagram tool, "d2" or "mermaid"
+
+    Returns:
+        tuple: (status, code_block) where status is None if no diagram was 
+               requested, otherwise "missing", "empty", "invalid" or "ok"
+    """
+    other_tool = "mermaid" if tool == "d2" else "d2"
+
+    # Check the query (ignoring case), the response only if the query doesn't
+    if not (_mentions_diagram(latest_query_str, tool, other_tool) or
+            _mentions_diagram(ai_response_str, tool, other_tool)):
+        return None, None
+
+    code_block_matches = _CODE_BLOCK_RE.findall(ai_response_str)
+    if not code_block_matches:
+        return "missing", None
+
+    code_block = code_block_matches[0]
+    if not code_block.strip():
+        return "empty", code_block
+
+    # Basic syntax validation, the code has to contain at least one d2-like
+    # or Mermaid-like pattern, and Mermaid code no obvious non-Mermaid patterns
+    if tool == "d2":
+        valid = _D2_DETECT_RE.search(code_block) is not None
+    else:
+        valid = (_MERMAID_DETECT_RE.search(code_block) is not None and
+                 _NOT_MERMAID_RE.search(code_block) is None)
+    return ("ok" if valid else "invalid"), code_block
+
+def _read_svg(svg_path):
+    """Read a generated SVG image, or return None if it wasn't created."""
+    if not os.path.exists(svg_path):
+        return None
+    with open(svg_path, "r", encoding="utf-8") as f:
+        return f.read()
+
+@st.cache_data(show_spinner='Processing your request...', max_entries=64)
+def _render_d2_diagram(code_block):
+    """
+    Render d2 code to an SVG image with the `d2` command line tool. Cached 
+    per code block, so diagrams in the chat history aren't rendered again on
+    every rerun.
+
+    Returns:
+        tuple: (svg, stderr) where svg is the SVG markup or None on failure
+    """
+    # Use a temporary directory for the generated image.
+    with tempfile.TemporaryDirectory() as tmpdirname:
+        output_img_path = os.path.join(tmpdirname, "output.svg")
+
+        # Call the d2 command with the code block piped to its stdin.
+        command = [
+            "d2",
+            "--sketch",
+            "-",
+            output_img_path
+        ]
+        result = subprocess.run(
+            command,
+            input=code_block,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True
+        )
+        return _read_svg(output_img_path), result.stderr
+
+@st.cache_data(show_spinner='Processing your request...', max_entries=64)
+def _render_mermaid_diagram(code_block):
+    """
+    Render Mermaid code to an SVG image with the `mmdc` command line tool. 
+    Cached per code block, so diagrams in the chat history aren't rendered 
+    again on every rerun. Timeouts and other errors are raised and not cached.
+
+    Returns:
+        tuple: (svg, returncode, stdout, stderr) where svg is the SVG markup
+               or None on failure
+    """
+    # Use a temporary directory for the generated image
+    with tempfile.TemporaryDirectory() as tmpdirname:
+        output_img_path = os.path.join(tmpdirname, "output.svg")
+
+        # Call the mmdc command with the code block piped to its stdin
+        command = [
+            "mmdc",
+            "-q",  # Quiet mode
+            "-i", "-",
+            "-o", output_img_path,
+        ]
+        result = subprocess.run(
+            command,
+            input=code_block,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            timeout=30  # Add timeout to prevent hanging
+        )
+        svg = _read_svg(output_img_path) if result.returncode == 0 else None
+        return svg, result.returncode, result.stdout, result.stderr
+
 def visualize_any_d2_diagram(latest_query, ai_response, show_image_expanded=True):
     """
     Generate and display a diagram using the `d2` tool if the latest query requests it.
@@ -365,11 +628,9 @@ def visualize_any_d2_diagram(latest_query, ai_response, show_image_expanded=True
       1. Converts the provided query and AI response to strings.
       2. Checks whether the query contains "d2" or "diagram" (case-insensitive).
       3. If the condition is met:
-         - Creates a temporary directory to hold temporary files.
-         - Writes the full AI response to a temporary file.
          - Extracts the first code block (delimited by triple backticks) from the AI response.
-         - Writes the extracted code block to another temporary file.
-         - Invokes the command-line tool `d2` (with the `--sketch` option) to generate an image from the code block.
+         - Invokes the command-line tool `d2` (with the `--sketch` option) to generate an image from the code block, passed on stdin.
+           The generated image is cached per code block.
          - Displays the resulting image using Streamlit.
       4. If the query does not request a diagram, displays an informational message.
 
@@ -385,93 +646,38 @@ def visualize_any_d2_diagram(latest_query, ai_response, show_image_expanded=True
     latest_query_str = str(latest_query)
     ai_response_str = str(ai_response)
 
-    # Check if the query contains "d2" or "diagram" (ignoring case)
-    if (
-        "d2" in latest_query_str.lower() and 
-        ("diagram" in latest_query_str.lower() or "sketch" in latest_query_str.lower()) and
-        "mermaid" not in latest_query_str.lower()
-    ) or (
-        "d2" in ai_response_str.lower() and 
-        ("diagram" in ai_response_str.lower() or "sketch" in ai_response_str.lower()) and
-        "mermaid" not in ai_response_str.lower()
-    ):
-        code_block_matches = re.findall(r"```(?:\w*\n)?(.*?)```", ai_response_str, re.DOTALL)
-
+    # Check if the query or response asks for a d2 diagram and extract its code
+    status, code_block = _find_diagram_code(latest_query_str, ai_response_str, "d2")
+    if status is not None:
         # Early return if no code block is found
-        if not code_block_matches:
+        if status == "missing":
             st.warning("No diagram code was found in the response. The AI assistant may need to provide the diagram code first.")
             return False
 
-        code_block = code_block_matches[0]
-
         # Early return if code block is empty
-        if not code_block.strip():
+        if status == "empty":
             st.warning("Empty diagram code block found. The AI assistant may need to provide valid diagram code.")
             return False
 
-        # Basic d2 syntax validation
-        def appears_to_be_d2_code(code):
-            # Common d2 syntax patterns
-            d2_patterns = [
-                r'->', # Arrows
-                r'-->', # Different arrow styles
-                r'<->', # Bidirectional arrows
-                r'\.+', # Connections using dots
-                r'shape:', # Shape definitions
-                r'style:', # Style definitions
-                r'direction:', # Direction specifications
-                r'\{.*?\}', # Block definitions
-                r'label:', # Label definitions
-            ]
-
-            # Check if the code contains at least one d2-like pattern
-            return any(re.search(pattern, code) for pattern in d2_patterns)
-
-        if not appears_to_be_d2_code(code_block):
+        # Early return if the code doesn't look like d2
+        if status == "invalid":
             return False
 
-        # Use a temporary directory for our temporary files.
-        with tempfile.TemporaryDirectory() as tmpdirname:
-            raw_answer_path = os.path.join(tmpdirname, "raw_ai_answer.txt")
-            raw_block_path = os.path.join(tmpdirname, "raw_block.txt")
-            output_img_path = os.path.join(tmpdirname, "output.svg")
-
-            # Write the full AI response to a temporary file.
-            with open(raw_answer_path, "w") as f:
-                f.write(ai_response_str)
-
-            # Write the extracted code block to a temporary file.
-            with open(raw_block_path, "w") as f:
-                f.write(code_block)
-
-            # Call the d2 command on the temporary raw_block file.
-            command = [
-                "d2",
-                "--sketch",
-                raw_block_path,
-                output_img_path
-            ]
-            with st.spinner('Processing your request...'):
-                result = subprocess.run(
-                    command,
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.PIPE,
-                    text=True
-                )
-
-            # Check for errors in the d2 command execution
-            if not re.match(r"^success: ", result.stderr):
-                with st.expander("Show stderr output", expanded=False):
-                    st.write("d2 stderr:", result.stderr)
+        svg, stderr = _render_d2_diagram(code_block)
 
-            # Display the image if the output file exists.
-            if os.path.exists(output_img_path):
-                with st.expander("Show generated diagram:", expanded=show_image_expanded):
-                    st.image(output_img_path, caption="Generated Diagram", use_container_width=True)
-                return True
-            else:
-                st.error("Failed to generate the diagram using d2.")
-                return False
+        # Check for errors in the d2 command execution
+        if not stderr.startswith("success: "):
+            with st.expander("Show stderr output", expanded=False):
+                st.write("d2 stderr:", stderr)
+
+        # Display the image if one was generated.
+        if svg is not None:
+            with st.expander("Show generated diagram:", expanded=show_image_expanded):
+                st.image(svg, caption="Generated Diagram", use_container_width=True)
+            return True
+        else:
+            st.error("Failed to generate the diagram using d2.")
+            return False
     return False
 
 def check_and_visualize_d2_diagrams_in_chat_history(messages, index, show_image_expanded=False):
@@ -515,13 +721,11 @@ def visualize_any_mermaid_diagram(latest_query, ai_response,
       2. Checks whether the query contains "mermaid" or "diagram"
          (case-insensitive).
       3. If the condition is met:
-         - Creates a temporary directory for holding temporary files.
-         - Writes the full AI response to a temporary file.
          - Extracts the first code block (delimited by triple backticks)
            from the AI response.
-         - Writes the extracted code block to another temporary file.
          - Invokes the command-line tool `mmdc` to generate an image from
-           the code block.
+           the code block, passed on stdin. The generated image is cached
+           per code block.
          - Displays the resulting image using Streamlit.
       4. If the query does not request a diagram, displays an
          informational message.
@@ -539,118 +743,54 @@ def visualize_any_mermaid_diagram(latest_query, ai_response,
     latest_query_str = str(latest_query)
     ai_response_str = str(ai_response)
 
-    # Check if the query explicitly requests a mermaid diagram
-    lq = latest_query_str.lower()
-    ar = ai_response_str.lower()
-
-    if (
-        "mermaid" in lq and ("diagram" in lq or "sketch" in lq) and "d2" not in lq
-    ) or (
-        "mermaid" in ar and ("diagram" in ar or "sketch" in ar) and "d2" not in ar
-    ):
-        code_block_matches = re.findall(
-            r"```(?:\w*\n)?(.*?)```", ai_response_str, re.DOTALL
-        )
-
+    # Check if the query explicitly requests a mermaid diagram and extract its code
+    status, code_block = _find_diagram_code(latest_query_str, ai_response_str, "mermaid")
+    if status is not None:
         # Early return if no code block is found
-        if not code_block_matches:
+        if status == "missing":
             st.warning("No diagram code was found in the response. The AI assistant may need to provide the diagram code first.")
             return False
 
-        code_block = code_block_matches[0]
-
         # Early return if code block is empty
-        if not code_block.strip():
+        if status == "empty":
             st.warning("Empty diagram code block found. The AI assistant may need to provide valid diagram code.")
             return False
 
-        # Basic Mermaid syntax validation
-        def appears_to_be_mermaid_code(code):
-            # Common Mermaid syntax patterns
-            mermaid_patterns = [
-                r'graph\s+[TBLR]?[DRLR]?', # Graph declarations
-                r'sequenceDiagram', # Sequence diagrams
-                r'classDiagram', # Class diagrams
-                r'stateDiagram-v2', # State diagrams
-                r'erDiagram', # Entity Relationship diagrams
-                r'pie\s*title', # Pie charts
-                r'gantt', # Gantt charts
-                r'flowchart\s+[TBLR]?[DRLR]?', # Flowcharts
-                r'-->|--[x]|==>', # Various arrow types
-                r'subgraph', # Subgraph declarations
-                r'participant', # Sequence diagram participants
-                r'class\s+\w+', # Class definitions
-                r'state\s+\w+', # State definitions
-            ]
-
-            # Check if the code contains at least one Mermaid-like pattern
-            # and doesn't contain obvious non-Mermaid patterns
-            return (any(re.search(pattern, code, re.IGNORECASE) for pattern in mermaid_patterns) and
-                   not re.search(r'import\s+|def\s+|class\s*:', code))  # Not Python code
-
-        if not appears_to_be_mermaid_code(code_block):
+        # Early return if the code doesn't look like Mermaid
+        if status == "invalid":
             st.warning("The code block doesn't appear to contain valid Mermaid diagram syntax. The AI assistant may need to provide correct Mermaid code.")
             return False
 
-        # Use a temporary directory for our temporary files
-        with tempfile.TemporaryDirectory() as tmpdirname:
-            raw_answer_path = os.path.join(tmpdirname, "raw_ai_answer.txt")
-            raw_block_path = os.path.join(tmpdirname, "raw_block.txt")
-            output_img_path = os.path.join(tmpdirname, "output.svg")
-
-            # Write the full AI response to a temporary file
-            with open(raw_answer_path, "w") as f:
-                f.write(ai_response_str)
-
-            # Write the extracted code block to a temporary file
-            with open(raw_block_path, "w") as f:
-                f.write(code_block)
-
-            # Call the mmdc command on the temporary raw_block file
-            command = [
-                "mmdc",
-                "-q",  # Quiet mode
-                "-i", raw_block_path,
-                "-o", output_img_path,
-            ]
-
-            with st.spinner('Processing your request...'):
-                try:
-                    result = subprocess.run(
-                        command,
-                        stdout=subprocess.PIPE,
-                        stderr=subprocess.PIPE,
-                        text=True,
-                        timeout=30  # Add timeout to prevent hanging
-                    )
-
-                    # Check for errors in the mmdc command execution
-                    if result.returncode != 0:
-                        with st.expander("Show stderr output", expanded=False):
-                            st.write("mmdc stderr:", result.stderr)
-                            st.write("mmdc stdout:", result.stdout)
-                        st.error("Failed to generate the diagram using mmdc.")
-                        return False
-
-                except subprocess.TimeoutExpired:
-                    st.error("Diagram generation timed out. The diagram might be too complex.")
-                    return False
-                except Exception as e:
-                    st.error(f"An error occurred while generating the diagram: {str(e)}")
-                    return False
-
-            # Display the image if the output file exists
-            if os.path.exists(output_img_path):
-                try:
-                    with st.expander("Show generated diagram:", expanded=show_image_expanded):
-                        st.image(output_img_path, caption="Generated Diagram", use_container_width=True)
-                    return True
-                except Exception as e:
-                    st.error(f"Failed to display the generated diagram: {str(e)}")
-                    return False
-            else:
+        try:
+            svg, returncode, stdout, stderr = _render_mermaid_diagram(code_block)
+
+            # Check for errors in the mmdc command execution
+            if returncode != 0:
+                with st.expander("Show stderr output", expanded=False):
+                    st.write("mmdc stderr:", stderr)
+                    st.write("mmdc stdout:", stdout)
                 st.error("Failed to generate the diagram using mmdc.")
                 return False
+
+        except subprocess.TimeoutExpired:
+            st.error("Diagram generation timed out. The diagram might be too complex.")
+            return False
+        except Exception as e:
+            st.error(f"An error occurred while generating the diagram: {str(e)}")
+            return False
+
+        # Display the image if one was generated
+        if svg is not None:
+            try:
+                with st.expander("Show generated diagram:", expanded=show_image_expanded):
+                    st.image(svg, caption="Generated Diagram", use_container_width=True)
+                return True
+            except Exception as e:
+                st.error(f"Failed to display the generated diagram: {str(e)}")
+                return False
+        else:
+            st.error("Failed to generate the diagram using mmdc.")
+            return False
     return False
 
 def check_and_visualize_mermaid_diagrams_in_chat_history(
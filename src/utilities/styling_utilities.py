@@ -11,69 +11,160 @@
 
 import streamlit as st
 import base64
+from collections.abc import Iterator
+import mimetypes
+import mmap
+import os
+import re
 
-# Function to hide the sidebar header in horizontal mode
-def hide_sidebar_header():
-    hide_sidebar_header_style = """
-                <style>
+# pybase64 is optional, it's a faster (SIMD) drop-in for the base64 module 
+# with identical output, used for encoding background images if installed
+try:
+    import pybase64
+except ImportError:
+    pybase64 = None
+
+# Streamlit serves the files in the static/ directory next to app.py under
+# app/static/ when server.enableStaticServing is on
+APP_STATIC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "static")
+
+# CSS rules used by the app wide styling helpers below
+_HIDE_SIDEBAR_HEADER_CSS = """
                 [data-testid="stSidebarHeader"] {
                     display: none;
                 }
-                </style>
-                """
-    hide_logo_icon_style = """
-                <style>
                 [data-testid="collapsedControl"] {
                     display: none;
                 }
-                </style>              
                 """
-    st.html(hide_sidebar_header_style)
-    st.html(hide_logo_icon_style)
 
-# Function to show the sidebar header with an image
-def hide_streamlit_header_menu_and_footer():
-    # Hide made by streamlit
-    hide_st_style = """
-                <style>
+_HIDE_HEADER_MENU_AND_FOOTER_CSS = """
                 #MainMenu {visibility: hidden;}
                 footer {visibility: hidden;}
                 header {visibility: hidden;}
-                </style>
                 """
-    st.html(hide_st_style)
 
-def reduce_vertical_main_padding():
-    # Custom CSS to reduce padding and margin above the headline
-    adjust_padding_margin_style = """
-                <style>
+_REDUCE_VERTICAL_MAIN_PADDING_CSS = """
                 [data-testid="stAppViewBlockContainer"]
                 {
                     padding-top: 0px;     /* Reduce padding above the content */
                     padding-bottom: 0px;  /* Adjust padding below the content if needed */
                     margin-top: 0px;      /* Reduce margin above the content */
                 }
-                </style>
                 """
-    st.html(adjust_padding_margin_style)
-    
-def tweak_logo_position_and_padding():
-    # Custom CSS to reduce padding and margin above the headline
-    adjust_sidebar_bottom_padding_style = """
-                <style>
-                [data-testid="stLogo"] {
-                    /* width: 550px;   Adjust the width as needed */
-                    /* height: auto;  Maintain aspect ratio */
-                }
 
+_LOGO_POSITION_AND_PADDING_CSS = """
                 [data-testid="stSidebarHeader"]
                 {
                     padding-left:   2.0rem;
                     padding-bottom: 10px;   /* Adjust padding below the content if needed */
                 }
-                </style>
                 """
-    st.html(adjust_sidebar_bottom_padding_style)
+
+_RESPONSIVE_PADDING_CSS = """
+                .responsive-padding {
+                    padding: 1vh 1vw;
+                }
+                """
+
+_CUSTOM_TABLE_CSS = """
+    .custom-table {
+        border-collapse: collapse;
+        width: 100%;
+        margin-bottom: 1rem;
+    }
+    .custom-table th, .custom-table td {
+        border: 2px solid #4CAF50;
+        padding: 8px;
+        text-align: left;
+    }
+    .custom-table th {
+        background-color: #4CAF50;
+        color: white;
+    }
+    .custom-table tr:nth-child(even) {
+        background-color: #f2f2f2;
+    }
+    """
+
+# Same look as style_dataframe, as a class for plain HTML tables
+_LAWN_TABLE_CSS = """
+    .lawn-table {
+        border-collapse: collapse;
+    }
+    .lawn-table td {
+        background-color: black;
+        color: lawngreen;
+        border: 1px solid lawngreen;
+    }
+    .lawn-table th {
+        background-color: black;
+        color: lawngreen;
+        border: 2px solid lawngreen;
+    }
+    """
+
+_CSS_COMMENT_RE = re.compile(r"/\*.*?\*/", re.DOTALL)
+
+def _style_element(*css_rules):
+    """
+    Combine CSS rules into a single style element, with comments removed and
+    all runs of whitespace collapsed to keep the payload sent on every rerun
+    small.
+    """
+    return "<style>" + " ".join(" ".join(_CSS_COMMENT_RE.sub("", css).split()) 
+                                for css in css_rules) + "</style>"
+
+# Style elements for the single purpose helpers, built once at import time
+_HIDE_SIDEBAR_HEADER_STYLE = _style_element(_HIDE_SIDEBAR_HEADER_CSS)
+_HIDE_HEADER_MENU_AND_FOOTER_STYLE = _style_element(_HIDE_HEADER_MENU_AND_FOOTER_CSS)
+_REDUCE_VERTICAL_MAIN_PADDING_STYLE = _style_element(_REDUCE_VERTICAL_MAIN_PADDING_CSS)
+_LOGO_POSITION_AND_PADDING_STYLE = _style_element(_LOGO_POSITION_AND_PADDING_CSS)
+_CUSTOM_TABLE_STYLE = _style_element(_CUSTOM_TABLE_CSS)
+_LAWN_TABLE_STYLE = _style_element(_LAWN_TABLE_CSS)
+
+# Static style block for all pages, built once at import time
+_STYLE_BLOCK = _style_element(_LOGO_POSITION_AND_PADDING_CSS, 
+                              _HIDE_HEADER_MENU_AND_FOOTER_CSS, 
+                              _REDUCE_VERTICAL_MAIN_PADDING_CSS, 
+                              _RESPONSIVE_PADDING_CSS)
+_HORIZONTAL_STYLE_BLOCK = _style_element(_LOGO_POSITION_AND_PADDING_CSS, 
+                                         _HIDE_SIDEBAR_HEADER_CSS, 
+                                         _HIDE_HEADER_MENU_AND_FOOTER_CSS, 
+                                         _REDUCE_VERTICAL_MAIN_PADDING_CSS, 
+                                         _RESPONSIVE_PADDING_CSS)
+
+def apply_app_styles(orientation="vertical"):
+    """
+    Injects all app wide CSS tweaks as a single style element. Streamlit 
+    removes elements that are not emitted again on a rerun, so this has to
+    be called on every run of the script.
+
+    Args:
+    orientation (str): Menu orientation, the sidebar header is hidden 
+                       when 'horizontal'.
+    """
+    if orientation == 'horizontal':
+        st.html(_HORIZONTAL_STYLE_BLOCK)
+    else:
+        st.html(_STYLE_BLOCK)
+
+# Function to hide the sidebar header in horizontal mode
+def hide_sidebar_header():
+    st.html(_HIDE_SIDEBAR_HEADER_STYLE)
+
+# Function to show the sidebar header with an image
+def hide_streamlit_header_menu_and_footer():
+    # Hide made by streamlit
+    st.html(_HIDE_HEADER_MENU_AND_FOOTER_STYLE)
+
+def reduce_vertical_main_padding():
+    # Custom CSS to reduce padding and margin above the headline
+    st.html(_REDUCE_VERTICAL_MAIN_PADDING_STYLE)
+    
+def tweak_logo_position_and_padding():
+    # Custom CSS to reduce padding and margin above the headline
+    st.html(_LOGO_POSITION_AND_PADDING_STYLE)
 
 # Define a function to style the DataFrame
 def style_dataframe(df):
@@ -88,6 +179,54 @@ def style_dataframe(df):
     ])
     return styled_df
 
+@st.cache_data(show_spinner=False)
+def styled_dataframe_html(df):
+    """
+    Returns the HTML of a DataFrame with the same look as style_dataframe, 
+    for use with st.html. The styling is a single CSS class rather than a 
+    pandas Styler, which builds CSS for every cell. The result is cached; 
+    st.cache_data hashes the DataFrame by its content, so an unchanged 
+    DataFrame isn't rendered again on a rerun. style_dataframe is kept for
+    callers that need a Styler, e.g. for st.dataframe.
+    """
+    return _LAWN_TABLE_STYLE + df.to_html(classes="lawn-table", border=0)
+
+def _base64_encode_file(image_file):
+    """
+    Base64 encode an open file. The file is memory mapped and encoded from 
+    the mapping, so no copy of the raw image data is made.
+    """
+    if os.fstat(image_file.fileno()).st_size == 0:
+        return ""  # Empty files can't be mapped
+    with mmap.mmap(image_file.fileno(), 0, access=mmap.ACCESS_READ) as image_data:
+        if pybase64 is not None:
+            return pybase64.b64encode(image_data).decode("ascii")
+        return base64.b64encode(image_data).decode("ascii")
+
+@st.cache_data(show_spinner=False)
+def _get_image_data_uri(image_path, mtime):
+    """
+    Read an image and return it as a base64 data URI, with the MIME type 
+    guessed from the file extension. Cached per path and modification time.
+    """
+    mime_type = mimetypes.guess_type(image_path)[0] or "image/png"
+    with open(image_path, "rb") as image_file:
+        return "".join(("data:", mime_type, ";base64,", _base64_encode_file(image_file)))
+
+def _background_image_url(image_path):
+    """
+    Return the CSS URL for a background image. Images in the app's static 
+    directory are referenced by their served URL if static serving is 
+    enabled, so the browser loads and caches them once. Other images are 
+    inlined as base64 data URIs.
+    """
+    image_path = os.path.abspath(image_path)
+    if (st.get_option("server.enableStaticServing") and 
+        os.path.commonpath([image_path, APP_STATIC_DIR]) == APP_STATIC_DIR):
+        relative_path = os.path.relpath(image_path, APP_STATIC_DIR).replace(os.sep, "/")
+        return f"./app/static/{relative_path}"
+    return _get_image_data_uri(image_path, os.path.getmtime(image_path))
+
 def set_background_images(img_path_1: str, img_path_2: str) -> None:
     """
     Sets background images for the Streamlit app container and bottom block.
@@ -102,22 +241,18 @@ def set_background_images(img_path_1: str, img_path_2: str) -> None:
     None: This function applies the styling directly using st.markdown.
     """
 
-    def get_base64_image(image_path):
-        with open(image_path, "rb") as image_file:
-            return base64.b64encode(image_file.read()).decode()
-
-    img_base64_1 = get_base64_image(img_path_1)
-    img_base64_2 = get_base64_image(img_path_2)
+    img_url_1 = _background_image_url(img_path_1)
+    img_url_2 = _background_image_url(img_path_2)
 
     page_bg_img = f"""
     <style>
     [data-testid="stAppViewContainer"], [data-testid="stBottomBlockContainer"] {{
-    background-image: url("data:image/png;base64,{img_base64_1}");
+    background-image: url("{img_url_1}");
     background-size: cover;
     }}
 
     [data-testid="stBottomBlockContainer"] {{
-    background-image: url("data:image/png;base64,{img_base64_2}");
+    background-image: url("{img_url_2}");
     background-size: cover;
     }}
     </style>
@@ -132,7 +267,9 @@ def render_chat_message(message, user_avatar=None, assistant_avatar=None, custom
     Args:
     message (dict): A dictionary containing the chat message information.
                     Expected to have at least a 'role' key ('user' or 'assistant')
-                    and a 'content' key with the message content.
+                    and a 'content' key with the message content. The content
+                    can also be an iterator of text chunks, e.g. a streamed 
+                    LLM response, which is rendered with st.write_stream.
     user_avatar (str, optional): HTML string for the user's avatar. Defaults to None.
     assistant_avatar (str, optional): HTML string for the assistant's avatar. Defaults to None.
     custom_render_func (callable, optional): A function that defines custom rendering logic
@@ -141,46 +278,28 @@ def render_chat_message(message, user_avatar=None, assistant_avatar=None, custom
                                              Defaults to None.
 
     Returns:
-    None: This function renders the chat message directly in the Streamlit app.
+    str or None: The full streamed text if the content was an iterator, 
+                 otherwise None. The message is rendered directly in the 
+                 Streamlit app.
 
     Note:
     If no custom_render_func is provided, the function defaults to rendering
-    the message content as markdown. The custom_render_func allows for
+    the message content as markdown. Streamed content is always rendered with
+    st.write_stream, which appends the chunks as they arrive. The custom_render_func allows for
     handling of complex message types (e.g., charts, tables) specific to
     different assistants.
     """
-    avatar = None
-    if message["role"] == "user" and user_avatar:
-        avatar = user_avatar
-    elif message["role"] == "assistant" and assistant_avatar:
-        avatar = assistant_avatar
+    # Other roles, or roles without an avatar, use Streamlit's default avatar
+    avatar = {"user": user_avatar, "assistant": assistant_avatar}.get(message["role"]) or None
 
     with st.chat_message(message["role"], avatar=avatar):
+        content = message["content"]
+        if isinstance(content, Iterator):
+            return st.write_stream(content)
         if custom_render_func and callable(custom_render_func):
-            custom_render_func(message["content"])
+            custom_render_func(content)
         else:
-            st.markdown(str(message["content"]))
+            st.markdown(content if isinstance(content, str) else str(content))
 
 def apply_custom_table_style():
-    custom_table_style = """
-    <style>
-    .custom-table {
-        border-collapse: collapse;
-        width: 100%;
-        margin-bottom: 1rem;
-    }
-    .custom-table th, .custom-table td {
-        border: 2px solid #4CAF50;
-        padding: 8px;
-        text-align: left;
-    }
-    .custom-table th {
-        background-color: #4CAF50;
-        color: white;
-    }
-    .custom-table tr:nth-child(even) {
-        background-color: #f2f2f2;
-    }
-    </style>
-    """
-    st.html(custom_table_style)
\ No newline at end of file
+    st.html(_CUSTOM_TABLE_STYLE)
\ No newline at end of file